@@ -1,18 +1,27 @@
 # FILE: app/api/chatbots_routes.py
 
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from typing import List, Optional
+import hashlib
 import uuid
 import logging
 from app.schemas.chatbot_schemas import (
     # --- IMPORT THE NEW SCHEMA ---
     ApiKeyChatQuery, 
+    ApiKeyBatchQuery,
     AdaptiveResponse, 
+    BatchResponse,
+    JobSubmitResponse,
+    JobStatusResponse,
     LegalResponse,
     ChatHistoryResponse, 
     SessionsResponse, 
     DeleteResponse
 )
 from app.services.legalchatbot import AdaptiveLegalChatbot, LegalChatbot
+from app.services.plan_cache import normalize_query
+from app.services.job_queue import JobManager, JobQueueFullError
+from app.core.config import settings
 
 router = APIRouter(prefix="/chat")
 
@@ -33,6 +42,13 @@ def get_legacy_chatbot(request: Request) -> LegalChatbot:
         raise HTTPException(status_code=503, detail="Legacy chatbot service is not available.")
     return service
 
+def get_job_manager(request: Request) -> JobManager:
+    """Dependency to get the shared background job manager."""
+    manager = getattr(request.app.state, 'job_manager', None)
+    if not manager:
+        raise HTTPException(status_code=503, detail="Job service is not available.")
+    return manager
+
 # --- MODIFIED CHAT ENDPOINTS ---
 
 @router.post("/legal_assistant", response_model=AdaptiveResponse)
@@ -83,6 +99,35 @@ async def ask_simple_chatbot(
         logging.error(f"Error in ask_simple_chatbot: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/legal_assistant/batch", response_model=BatchResponse)
+async def ask_batch_chatbot(
+    request_data: ApiKeyBatchQuery,
+    chatbot: AdaptiveLegalChatbot = Depends(get_adaptive_chatbot)
+):
+    """Answers many independent queries in one call, with per-item results and errors."""
+    if len(request_data.queries) > settings.BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {settings.BATCH_MAX_QUERIES} queries.")
+    try:
+        results = await chatbot.ask_batch(
+            queries=request_data.queries,
+            google_api_key=request_data.google_api_key,
+            cohere_api_key=request_data.cohere_api_key,
+            tavily_api_key=request_data.tavily_api_key,
+            max_concurrency=request_data.max_concurrency
+        )
+    except ValueError as e:
+        # Chain construction failed, which means the API keys are unusable
+        raise HTTPException(status_code=400, detail=f"I apologize, but I encountered an issue with the provided API keys: {e}")
+    except Exception as e:
+        logging.error(f"Error in ask_batch_chatbot: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    return BatchResponse(
+        results=results,
+        count=len(results),
+        unique_queries=len({normalize_query(q) for q in request_data.queries}),
+        failed=sum(1 for item in results if item["error"])
+    )
+
 @router.post("/legal_assistant/legacy", response_model=LegalResponse)
 async def ask_legacy_chatbot(
     # Use the new schema to accept API keys
@@ -107,22 +152,92 @@ async def ask_legacy_chatbot(
         logging.error(f"Error in ask_legacy_chatbot: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-# --- Session & History Management Endpoints (no changes needed) ---
-# These endpoints only interact with the history store, so they are fine.
+# --- Background Job Endpoints ---
+# Long RAG + web + synthesis runs can outlast proxy timeouts, so clients
+# may submit a query and poll for the result instead.
+
+@router.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_job(request_data: ApiKeyChatQuery, jobs: JobManager = Depends(get_job_manager)):
+    """Queue a legal assistant query and return its job id immediately."""
+    session_id = request_data.session_id or str(uuid.uuid4())
+    try:
+        record = await jobs.submit(
+            query=request_data.query,
+            session_id=session_id,
+            google_api_key=request_data.google_api_key,
+            cohere_api_key=request_data.cohere_api_key,
+            tavily_api_key=request_data.tavily_api_key
+        )
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return JobSubmitResponse(job_id=record["job_id"], status=record["status"], session_id=session_id)
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """Get the status, stage progress and (when finished) the result of a job."""
+    record = jobs.get(job_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatusResponse(**record)
+
+# --- Session & History Management Endpoints ---
+# These endpoints only interact with the history store and its session index.
 
 @router.get("/sessions", response_model=SessionsResponse)
-async def get_all_sessions(chatbot: AdaptiveLegalChatbot = Depends(get_adaptive_chatbot)):
-    """Get all active session IDs with their titles."""
-    sessions = chatbot.get_sessions_with_titles()
-    return SessionsResponse(sessions=sessions, count=len(sessions))
+async def get_all_sessions(
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size; omit to list every session"),
+    after: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+    chatbot: AdaptiveLegalChatbot = Depends(get_adaptive_chatbot)
+):
+    """Get active sessions with their titles, newest first."""
+    try:
+        sessions, next_cursor = chatbot.list_sessions(limit=limit, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return SessionsResponse(sessions=sessions, count=len(sessions), total=len(chatbot.session_index), next_cursor=next_cursor)
 
 @router.get("/history/{session_id}", response_model=ChatHistoryResponse)
-async def get_chat_history(session_id: str, chatbot: AdaptiveLegalChatbot = Depends(get_adaptive_chatbot)):
-    """Get chat history for a specific session."""
-    messages = chatbot.get_session_messages(session_id)
-    if not messages and not chatbot.get_session_history(session_id):
+async def get_chat_history(
+    session_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size; omit to return the full history"),
+    after: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous (newer) page"),
+    chatbot: AdaptiveLegalChatbot = Depends(get_adaptive_chatbot)
+):
+    """
+    Get chat history for a specific session.
+    Supports If-None-Match so polling clients get a 304 when nothing changed.
+    """
+    if not chatbot.session_exists(session_id):
          raise HTTPException(status_code=404, detail="Session not found")
-    return ChatHistoryResponse(session_id=session_id, messages=messages, count=len(messages))
+
+    etag = _history_etag(session_id, chatbot.get_session_version(session_id), limit, after)
+    client_tags = _parse_if_none_match(request.headers.get("if-none-match"))
+    if etag in client_tags or "*" in client_tags:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    if limit is None:
+        messages, next_cursor = chatbot.get_session_messages(session_id), None
+    else:
+        try:
+            messages, next_cursor = chatbot.get_session_messages_page(session_id, limit=limit, after=after)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return ChatHistoryResponse(session_id=session_id, messages=messages, count=len(messages), next_cursor=next_cursor)
+
+def _history_etag(session_id: str, version: Optional[str], limit: Optional[int], after: Optional[str]) -> str:
+    """Weak ETag for one page of a session's history; changes on every write to the session."""
+    digest = hashlib.sha1(f"{session_id}:{version}:{limit}:{after}".encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def _parse_if_none_match(header: Optional[str]) -> List[str]:
+    if not header:
+        return []
+    # Weak comparison: W/"x" and "x" are treated as the same tag
+    tags = [tag.strip() for tag in header.split(",") if tag.strip()]
+    return [tag if tag == "*" or tag.startswith("W/") else f"W/{tag}" for tag in tags]
 
 @router.delete("/sessions/{session_id}", response_model=DeleteResponse)
 async def delete_session(session_id: str, chatbot: AdaptiveLegalChatbot = Depends(get_adaptive_chatbot)):
@@ -144,12 +259,14 @@ async def clear_chat_history(session_id: str, chatbot: AdaptiveLegalChatbot = De
         raise HTTPException(status_code=404, detail="Session not found")
     return DeleteResponse(message=f"Chat history cleared for session {session_id}", success=True, session_id=session_id)
 
-# --- Health Check (no changes needed) ---
+# --- Health Check ---
 @router.get("/health")
 async def chatbot_health(request: Request):
     """Health check endpoint to verify chatbot initialization."""
     return {
         "status": "healthy" if hasattr(request.app.state, 'adaptive_chatbot_service') and request.app.state.adaptive_chatbot_service else "unavailable",
         "adaptive_chatbot_service_initialized": hasattr(request.app.state, 'adaptive_chatbot_service') and request.app.state.adaptive_chatbot_service is not None,
-        "legacy_chatbot_service_initialized": hasattr(request.app.state, 'legacy_chatbot_service') and request.app.state.legacy_chatbot_service is not None
+        "legacy_chatbot_service_initialized": hasattr(request.app.state, 'legacy_chatbot_service') and request.app.state.legacy_chatbot_service is not None,
+        "plan_cache": request.app.state.plan_cache.stats() if getattr(request.app.state, 'plan_cache', None) else None,
+        "startup": request.app.state.startup_timings.snapshot() if getattr(request.app.state, 'startup_timings', None) else None
     }
\ No newline at end of file
@@ -1,6 +1,7 @@
 # FILE: config.py
 
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
@@ -14,6 +15,62 @@ class Settings(BaseSettings):
     """
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding='utf-8', extra='ignore')
     CHROMA_DB_PATH: str = "chroma_db"
+    # Threads used to search several act partitions in parallel
+    PARTITION_SEARCH_WORKERS: int = 4
+
+    # --- Retrieval / HNSW Tuning ---
+    # Chunks returned per RAG query. The HNSW values are unset by default, which
+    # keeps Chroma's own defaults. M and construction_ef only take effect when
+    # collections are (re)built by create_vectorstore.py; a set search_ef is
+    # also applied to existing collections when they are opened.
+    # Measure trade-offs with benchmarks/retrieval_benchmark.py.
+    RETRIEVAL_K: int = 5
+    HNSW_M: Optional[int] = None
+    HNSW_CONSTRUCTION_EF: Optional[int] = None
+    HNSW_SEARCH_EF: Optional[int] = None
+
+    # --- Diversified Retrieval ---
+    # "similarity" returns the plain top-k; "mmr" over-fetches MMR_FETCH_K
+    # candidates, drops those below max(RELEVANCE_MIN_SCORE, best * RELEVANCE_CUTOFF_RATIO)
+    # cosine similarity, and picks up to k with maximal marginal relevance.
+    RETRIEVAL_MODE: str = "similarity"
+    MMR_FETCH_K: int = 20
+    MMR_LAMBDA: float = 0.7
+    RELEVANCE_CUTOFF_RATIO: float = 0.8
+    RELEVANCE_MIN_SCORE: float = 0.2
+
+    # --- Retrieval Backend ---
+    # "chroma" searches the persisted Chroma collections; "compact" searches the
+    # quantized, memory-mapped index built by build_compact_index.py; "snapshot"
+    # searches the single-file snapshot written by index_snapshot.py.
+    RETRIEVAL_BACKEND: str = "chroma"
+    COMPACT_INDEX_PATH: str = "compact_index"
+    # Candidates re-ranked with full-precision vectors after the quantized pass
+    COMPACT_RESCORE_CANDIDATES: int = 50
+    INDEX_SNAPSHOT_PATH: str = "legal_index.lmsnap"
+    # Re-hash every snapshot section on load (reads the whole file once)
+    INDEX_SNAPSHOT_VERIFY: bool = False
+
+    # --- Startup ---
+    # Preload provider SDKs, the vector index and prompts in a background thread.
+    WARMUP_ON_STARTUP: bool = False
+
+    # --- Planner Plan Cache ---
+    # Set PLAN_CACHE_MAX_ENTRIES to 0 to disable caching entirely.
+    PLAN_CACHE_MAX_ENTRIES: int = 1024
+    PLAN_CACHE_WEB_TTL_SECONDS: float = 900.0
+    PLAN_CACHE_STATIC_TTL_SECONDS: float = 86400.0
+    PLAN_CACHE_HISTORY_WINDOW: int = 6
+
+    # --- Batch Queries ---
+    # Cohere accepts at most 96 texts per embed call, so keep the batch below that.
+    BATCH_MAX_QUERIES: int = 50
+    BATCH_MAX_CONCURRENCY: int = 4
+
+    # --- Background Jobs ---
+    JOB_WORKERS: int = 2
+    JOB_MAX_QUEUED: int = 100
+    JOB_RESULT_TTL_SECONDS: float = 3600.0
 
 # Create a single, globally accessible instance of the settings
 settings = Settings()
\ No newline at end of file
@@ -1,6 +1,5 @@
 # FILE: llm.py
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 import os
 
@@ -16,6 +15,9 @@ def get_gemini(google_api_key: str, model_name="gemini-2.5-flash", temperature=0
     if not google_api_key:
         raise ValueError("A Google API Key must be provided to initialize the model.")
 
+    # Imported here so the Gemini SDK is only loaded once a model is actually needed
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
     llm = ChatGoogleGenerativeAI(model=model_name, temperature=temperature, google_api_key=google_api_key)
     return llm
 
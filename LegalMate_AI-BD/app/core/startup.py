@@ -0,0 +1,64 @@
+# FILE: app/core/startup.py
+
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux (peak, not current) and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StartupTimings:
+    """
+    Records how long each startup phase took (imports, service init, warmup)
+    so cold-start cost is visible from /chat/health.
+    """
+
+    def __init__(self):
+        self._phases: Dict[str, float] = {}
+        self._memory: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.warmup_status = "disabled"
+
+    def record(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self._phases[phase] = seconds
+
+    def record_memory(self, phase: str, rss_delta_mb: float) -> None:
+        with self._lock:
+            self._memory[phase] = rss_delta_mb
+
+    @contextmanager
+    def measure(self, phase: str, memory: bool = False) -> Iterator[None]:
+        """Times the block; with `memory`, also records how much RSS it added."""
+        started, rss_before = time.perf_counter(), current_rss_mb() if memory else 0.0
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+            if memory:
+                self.record_memory(phase, current_rss_mb() - rss_before)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            phases_ms = {phase: round(seconds * 1000, 1) for phase, seconds in self._phases.items()}
+            rss_delta_mb = {phase: round(mb, 1) for phase, mb in self._memory.items()}
+        return {"phases_ms": phases_ms, "rss_delta_mb": rss_delta_mb, "rss_mb": round(current_rss_mb(), 1), "warmup": self.warmup_status}
+
+
+# Single, process-wide record shared by main.py and the warmup thread
+startup_timings = StartupTimings()
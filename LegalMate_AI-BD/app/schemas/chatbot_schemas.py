@@ -18,6 +18,14 @@ class ApiKeyChatQuery(BaseModel):
     cohere_api_key: str = Field("", description="User's Cohere API Key (mandatory for RAG, checked in service)")
     tavily_api_key: str = Field("", description="User's Tavily API Key (optional for Web Search)")
 
+class ApiKeyBatchQuery(BaseModel):
+    """Schema for a batch of independent queries sharing one set of API keys."""
+    queries: List[str] = Field(..., min_length=1, description="Queries to answer; identical queries are answered once.")
+    google_api_key: str = Field(..., description="User's Google API Key")
+    cohere_api_key: str = Field("", description="User's Cohere API Key (mandatory for RAG, checked in service)")
+    tavily_api_key: str = Field("", description="User's Tavily API Key (optional for Web Search)")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="Optional cap on concurrent LLM calls (bounded by server settings).")
+
 class SourceDocument(BaseModel):
     """Schema for a single source document used in the response."""
     source: str = Field(description="The name of the source document, e.g., 'constitution_of_india.pdf'.")
@@ -31,6 +39,41 @@ class AdaptiveResponse(BaseModel):
     response_type: str = Field(description="Type of response: adaptive, legal, general, or error")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional response metadata")
 
+class BatchItemResult(BaseModel):
+    """Result for a single query within a batch request."""
+    index: int = Field(description="Position of the query in the submitted list")
+    query: str
+    response: Optional[str] = Field(default=None, description="The AI's response, or null if this item failed")
+    response_type: str = Field(description="Type of response: adaptive or error")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional response metadata")
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    """Schema for batch query results, in the same order as the submitted queries."""
+    results: List[BatchItemResult]
+    count: int
+    unique_queries: int
+    failed: int
+
+class JobSubmitResponse(BaseModel):
+    """Response schema returned immediately after a job is queued."""
+    job_id: str
+    status: str
+    session_id: str
+
+class JobStatusResponse(BaseModel):
+    """Schema for polling a background job."""
+    job_id: str
+    status: str = Field(description="queued, running, completed or failed")
+    stage: str = Field(description="The pipeline stage the job is currently in")
+    stages: List[Dict[str, Any]] = Field(default_factory=list, description="Stages reached so far, with timestamps")
+    session_id: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[AdaptiveResponse] = None
+    error: Optional[str] = None
+
 class LegalResponse(BaseModel):
     """Legacy structured response - kept for compatibility."""
     explanation: str = Field(description="A clear and detailed explanation of the legal concept.")
@@ -46,6 +89,7 @@ class ChatHistoryResponse(BaseModel):
     session_id: str
     messages: List[Dict[str, Any]]
     count: int
+    next_cursor: Optional[str] = Field(default=None, description="Pass as `after` to fetch older messages; null on the last page")
 
 class DeleteResponse(BaseModel):
     """Response schema for deletion operations."""
@@ -57,8 +101,12 @@ class SessionInfo(BaseModel):
     """Schema for basic information about a single chat session."""
     id: str
     title: str
+    last_activity: Optional[float] = None
+    message_count: Optional[int] = None
 
 class SessionsResponse(BaseModel):
-    """Response schema for listing all sessions."""
+    """Response schema for listing sessions, newest first."""
     sessions: List[SessionInfo]
-    count: int
\ No newline at end of file
+    count: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = Field(default=None, description="Pass as `after` to fetch the next page; null on the last page")
\ No newline at end of file
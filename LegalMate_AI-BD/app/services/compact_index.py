@@ -0,0 +1,217 @@
+# FILE: app/services/compact_index.py
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+# --- COMPACT INDEX LAYOUT ---
+# manifest.json       format version, dimensions, row count, quantization, act names
+# vectors.f32.npy     full-precision, L2-normalized vectors (only read for rescoring)
+# vectors.int8.npy    int8 vectors + scales.f32.npy per-row dequantization scales, or
+# vectors.bin.npy     sign bits packed 8 per byte (binary quantization)
+# acts.u8.npy         act partition code per row
+# chunks.jsonl        chunk id, text and metadata per row
+#
+# Every array is opened with mmap_mode="r", so gunicorn workers on one host
+# share the same page-cache copy instead of each holding its own vectors.
+
+FORMAT_VERSION = 1
+QUANTIZATIONS = ("int8", "binary")
+# Rows scored per block; bounds the float32 temporaries created while scoring int8 rows
+SCORE_BLOCK_ROWS = 8192
+
+# Number of set bits for every byte value, used for Hamming distances
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization; returns (codes, scales) with vectors ~= codes * scales."""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """Keeps one sign bit per dimension, packed 8 dimensions per byte."""
+    return np.packbits(vectors > 0, axis=1)
+
+
+class CompactIndex:
+    """
+    Quantized, memory-mapped vector index with exact rescoring.
+
+    A search scores every row with the compact vectors, keeps the best
+    `rescore_candidates`, then re-ranks only those with full-precision
+    vectors read lazily from the memory-mapped float32 file.
+    """
+
+    def __init__(
+        self,
+        manifest: Dict[str, Any],
+        full: np.ndarray,
+        codes: np.ndarray,
+        scales: Optional[np.ndarray],
+        act_codes: np.ndarray,
+        chunks: Sequence[Dict[str, Any]],
+        rescore_candidates: int = settings.COMPACT_RESCORE_CANDIDATES,
+    ):
+        self.manifest = manifest
+        self.quantization = manifest["quantization"]
+        self.acts: List[str] = manifest["acts"]
+        self.full = full
+        self.codes = codes
+        self.scales = scales
+        self.act_codes = act_codes
+        self.chunks = chunks
+        self.rescore_candidates = rescore_candidates
+
+    @classmethod
+    def load(cls, path: str) -> "CompactIndex":
+        """Opens a compact index directory written by build_compact_index."""
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact index version {manifest.get('format_version')} in '{path}'.")
+
+        if manifest["quantization"] == "int8":
+            codes = np.load(os.path.join(path, "vectors.int8.npy"), mmap_mode="r")
+            scales = np.load(os.path.join(path, "scales.f32.npy"), mmap_mode="r")
+        else:
+            codes = np.load(os.path.join(path, "vectors.bin.npy"), mmap_mode="r")
+            scales = None
+        with open(os.path.join(path, "chunks.jsonl"), encoding="utf-8") as f:
+            chunks = [json.loads(line) for line in f]
+
+        return cls(
+            manifest,
+            full=np.load(os.path.join(path, "vectors.f32.npy"), mmap_mode="r"),
+            codes=codes,
+            scales=scales,
+            act_codes=np.load(os.path.join(path, "acts.u8.npy"), mmap_mode="r"),
+            chunks=chunks,
+        )
+
+    def __len__(self) -> int:
+        return self.full.shape[0]
+
+    def _approximate_scores(self, query: np.ndarray, rows: slice) -> np.ndarray:
+        if self.quantization == "int8":
+            # Dot product with dequantized rows: (codes . q) * scale
+            return (self.codes[rows].astype(np.float32) @ query) * self.scales[rows]
+        # Negative Hamming distance between sign bits (higher is closer)
+        query_bits = np.packbits(query > 0)
+        return -_POPCOUNT[np.bitwise_xor(self.codes[rows], query_bits)].sum(axis=1, dtype=np.int32).astype(np.float32)
+
+    def search(self, query_vector: List[float], k: int = 5, acts: Optional[List[str]] = None) -> List[Tuple[int, float]]:
+        """Returns (row, cosine similarity) pairs for the best `k` rows, best first."""
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        scores = np.concatenate([
+            self._approximate_scores(query, slice(start, start + SCORE_BLOCK_ROWS))
+            for start in range(0, len(self), SCORE_BLOCK_ROWS)
+        ]) if len(self) else np.empty(0, dtype=np.float32)
+
+        act_codes = [self.acts.index(act) for act in acts or [] if act in self.acts]
+        if act_codes:
+            scores[~np.isin(self.act_codes, act_codes)] = -np.inf
+
+        candidates = min(max(self.rescore_candidates, k), int(np.isfinite(scores).sum()))
+        if candidates == 0:
+            return []
+        shortlist = np.argpartition(-scores, candidates - 1)[:candidates]
+        # Fancy indexing on the memmap only pages in the shortlisted rows
+        shortlist.sort()
+        exact = self.full[shortlist] @ query
+        order = np.argsort(-exact)[:k]
+        return [(int(shortlist[i]), float(exact[i])) for i in order]
+
+    def search_documents(self, query_vector: List[float], k: int = 5, acts: Optional[List[str]] = None) -> List[Any]:
+        from langchain_core.documents import Document
+        return [
+            Document(page_content=self.chunks[row]["text"], metadata=self.chunks[row]["metadata"])
+            for row, _ in self.search(query_vector, k=k, acts=acts)
+        ]
+
+
+def iter_chroma_rows(persist_directory: str, page_size: int = 1000) -> Iterator[Tuple[str, str, Dict[str, Any], List[float], str]]:
+    """Yields (id, text, metadata, embedding, act) for every chunk the server searches in a persisted Chroma store."""
+    import chromadb
+    from app.services.vector_store import served_collections
+
+    client = chromadb.PersistentClient(path=persist_directory)
+    for name, default_act in served_collections(persist_directory):
+        collection = client.get_collection(name)
+        for offset in range(0, collection.count(), page_size):
+            page = collection.get(include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset)
+            for row_id, text, metadata, embedding in zip(page["ids"], page["documents"], page["metadatas"], page["embeddings"]):
+                metadata = metadata or {}
+                yield row_id, text, metadata, embedding, metadata.get("act", default_act)
+
+
+def build_compact_index(persist_directory: str, output_path: str, quantization: str = "int8") -> Dict[str, Any]:
+    """Exports every chunk of a persisted Chroma store into a compact index directory."""
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization '{quantization}'. Choose one of: {', '.join(QUANTIZATIONS)}.")
+
+    rows = list(iter_chroma_rows(persist_directory))
+    if not rows:
+        raise ValueError(f"No chunks found in '{persist_directory}'.")
+
+    vectors = _normalize(np.asarray([row[3] for row in rows], dtype=np.float32))
+    acts = sorted({row[4] for row in rows})
+    os.makedirs(output_path, exist_ok=True)
+
+    np.save(os.path.join(output_path, "vectors.f32.npy"), vectors)
+    np.save(os.path.join(output_path, "acts.u8.npy"), np.asarray([acts.index(row[4]) for row in rows], dtype=np.uint8))
+    if quantization == "int8":
+        codes, scales = quantize_int8(vectors)
+        np.save(os.path.join(output_path, "vectors.int8.npy"), codes)
+        np.save(os.path.join(output_path, "scales.f32.npy"), scales)
+    else:
+        np.save(os.path.join(output_path, "vectors.bin.npy"), quantize_binary(vectors))
+
+    with open(os.path.join(output_path, "chunks.jsonl"), "w", encoding="utf-8") as f:
+        for row_id, text, metadata, _, _ in rows:
+            f.write(json.dumps({"id": row_id, "text": text, "metadata": metadata}, ensure_ascii=False) + "\n")
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "quantization": quantization,
+        "count": int(vectors.shape[0]),
+        "dimensions": int(vectors.shape[1]),
+        "acts": acts,
+    }
+    with open(os.path.join(output_path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+_compact_index: Optional[CompactIndex] = None
+_compact_index_lock = threading.Lock()
+
+
+def get_compact_index() -> CompactIndex:
+    """
+    Opens the configured compact index once per process: the snapshot file
+    when RETRIEVAL_BACKEND is "snapshot", otherwise the compact index directory.
+    """
+    global _compact_index
+    if _compact_index is None:
+        with _compact_index_lock:
+            if _compact_index is None:
+                if settings.RETRIEVAL_BACKEND == "snapshot":
+                    from app.services.index_snapshot import load_snapshot
+                    _compact_index = load_snapshot(settings.INDEX_SNAPSHOT_PATH, verify=settings.INDEX_SNAPSHOT_VERIFY)
+                else:
+                    _compact_index = CompactIndex.load(settings.COMPACT_INDEX_PATH)
+    return _compact_index
@@ -0,0 +1,57 @@
+# FILE: app/services/diversify.py
+
+from typing import List
+
+import numpy as np
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def cosine_similarities(query_vector: List[float], candidate_vectors: np.ndarray) -> np.ndarray:
+    return _normalize(np.asarray(candidate_vectors, dtype=np.float32)) @ _normalize(np.asarray(query_vector, dtype=np.float32))
+
+
+def relevance_cutoff(similarities: np.ndarray, ratio: float, min_score: float) -> np.ndarray:
+    """
+    Indices of candidates worth keeping: at least `min_score`, and within
+    `ratio` of the best match so weak tails are dropped instead of padding to k.
+    The best candidate is always kept.
+    """
+    if similarities.size == 0:
+        return np.empty(0, dtype=np.int64)
+    best = float(similarities.max())
+    keep = np.flatnonzero(similarities >= max(min_score, best * ratio))
+    return keep if keep.size else np.array([int(similarities.argmax())])
+
+
+def mmr_select(query_vector: List[float], candidate_vectors: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+    """
+    Greedy maximal marginal relevance.
+
+    All candidate-to-candidate similarities come from a single matrix product;
+    each greedy step is then a vectorized max over that matrix rather than a
+    fresh round of similarity computations.
+    """
+    candidates = _normalize(np.asarray(candidate_vectors, dtype=np.float32))
+    if len(candidates) == 0 or k <= 0:
+        return []
+    relevance = candidates @ _normalize(np.asarray(query_vector, dtype=np.float32))
+    pairwise = candidates @ candidates.T
+
+    selected = [int(relevance.argmax())]
+    redundancy = pairwise[selected[0]].copy()
+    while len(selected) < min(k, len(candidates)):
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        pick = int(scores.argmax())
+        selected.append(pick)
+        np.maximum(redundancy, pairwise[pick], out=redundancy)
+    return selected
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English legal text)."""
+    return (len(text) + 3) // 4
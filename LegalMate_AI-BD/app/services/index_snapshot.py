@@ -0,0 +1,195 @@
+# FILE: app/services/index_snapshot.py
+
+import hashlib
+import json
+import os
+import struct
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.services.compact_index import CompactIndex, QUANTIZATIONS, _normalize, iter_chroma_rows, quantize_binary, quantize_int8
+from app.services.vector_store import EMBEDDING_MODEL
+
+# --- SNAPSHOT FILE LAYOUT ---
+# MAGIC (8 bytes) | header length (uint64 LE) | header JSON | padding | sections...
+#
+# The header records the format version, embedding model, row count, acts and,
+# for every section, its dtype, shape, byte offset (relative to the first
+# section) and SHA-256. Sections start on page boundaries so each one can be
+# memory-mapped directly; nothing in the file is pickled.
+#
+# Sections: full-precision vectors, quantized codes (+ int8 scales), act codes,
+# and chunk ids, texts and metadata JSON stored as offset tables + UTF-8 blobs.
+
+MAGIC = b"LMSNAP\x00\x01"
+FORMAT_VERSION = 1
+ALIGNMENT = 4096
+_PREFIX = struct.Struct("<8sQ")
+
+
+def _align(size: int) -> int:
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _pack_strings(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(item) for item in encoded], dtype=np.uint64)
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+class SnapshotChunks(Sequence):
+    """Decodes chunk id, text and metadata on access from memory-mapped blobs."""
+
+    def __init__(self, sections: Dict[str, np.ndarray]):
+        self._sections = sections
+
+    def __len__(self) -> int:
+        return len(self._sections["id_offsets"]) - 1
+
+    def _string(self, name: str, row: int) -> str:
+        offsets = self._sections[f"{name}_offsets"]
+        return bytes(self._sections[f"{name}_blob"][int(offsets[row]):int(offsets[row + 1])]).decode("utf-8")
+
+    def __getitem__(self, row: int) -> Dict[str, Any]:
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return {"id": self._string("id", row), "text": self._string("text", row), "metadata": json.loads(self._string("metadata", row))}
+
+
+def export_snapshot(persist_directory: str, output_path: str, quantization: str = "int8") -> Dict[str, Any]:
+    """Packs every chunk of a persisted Chroma store into one snapshot file (written atomically)."""
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization '{quantization}'. Choose one of: {', '.join(QUANTIZATIONS)}.")
+
+    rows = list(iter_chroma_rows(persist_directory))
+    if not rows:
+        raise ValueError(f"No chunks found in '{persist_directory}'.")
+
+    vectors = _normalize(np.asarray([row[3] for row in rows], dtype=np.float32))
+    acts = sorted({row[4] for row in rows})
+    sections: Dict[str, np.ndarray] = {
+        "vectors_f32": vectors,
+        "act_codes": np.asarray([acts.index(row[4]) for row in rows], dtype=np.uint8),
+    }
+    if quantization == "int8":
+        sections["codes"], sections["scales"] = quantize_int8(vectors)
+    else:
+        sections["codes"] = quantize_binary(vectors)
+    sections["id_offsets"], sections["id_blob"] = _pack_strings([row[0] for row in rows])
+    sections["text_offsets"], sections["text_blob"] = _pack_strings([row[1] or "" for row in rows])
+    sections["metadata_offsets"], sections["metadata_blob"] = _pack_strings([json.dumps(row[2], ensure_ascii=False) for row in rows])
+
+    layout, offset = {}, 0
+    for name, array in sections.items():
+        array = np.ascontiguousarray(array)
+        sections[name] = array
+        layout[name] = {
+            "offset": offset,
+            "nbytes": int(array.nbytes),
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "sha256": hashlib.sha256(array.tobytes()).hexdigest(),
+        }
+        offset = _align(offset + array.nbytes)
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "embedding_model": EMBEDDING_MODEL,
+        "quantization": quantization,
+        "count": int(vectors.shape[0]),
+        "dimensions": int(vectors.shape[1]),
+        "acts": acts,
+        "sections": layout,
+    }
+    header_bytes = json.dumps(header, indent=1).encode("utf-8")
+    data_start = _align(_PREFIX.size + len(header_bytes))
+
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in sections.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(temp_path, output_path)
+    return header
+
+
+def read_header(path: str) -> Tuple[Dict[str, Any], int]:
+    """Returns the snapshot header and the file offset of the first section."""
+    with open(path, "rb") as f:
+        magic, header_length = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not a LegalMate index snapshot.")
+        header = json.loads(f.read(header_length).decode("utf-8"))
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {header.get('format_version')} in '{path}'.")
+    return header, _align(_PREFIX.size + header_length)
+
+
+def _map_sections(path: str, header: Dict[str, Any], data_start: int) -> Dict[str, np.ndarray]:
+    expected_size = data_start + max(_align(spec["offset"] + spec["nbytes"]) for spec in header["sections"].values())
+    if os.path.getsize(path) < expected_size:
+        raise ValueError(f"Snapshot '{path}' is truncated.")
+    sections = {}
+    for name, spec in header["sections"].items():
+        if spec["nbytes"] == 0:
+            # np.memmap cannot map zero bytes (e.g. an empty text blob)
+            sections[name] = np.empty(spec["shape"], dtype=spec["dtype"])
+        else:
+            sections[name] = np.memmap(path, dtype=spec["dtype"], mode="r", offset=data_start + spec["offset"], shape=tuple(spec["shape"]))
+    return sections
+
+
+def _verify_sections(path: str, header: Dict[str, Any], sections: Dict[str, np.ndarray]) -> None:
+    for name, array in sections.items():
+        if hashlib.sha256(np.ascontiguousarray(array).tobytes()).hexdigest() != header["sections"][name]["sha256"]:
+            raise ValueError(f"Checksum mismatch in section '{name}' of '{path}'.")
+
+
+def verify_snapshot(path: str) -> Dict[str, Any]:
+    """Checks every section against its recorded SHA-256; raises ValueError on mismatch."""
+    header, data_start = read_header(path)
+    _verify_sections(path, header, _map_sections(path, header, data_start))
+    return header
+
+
+def load_snapshot(path: str, verify: bool = False) -> CompactIndex:
+    """
+    Memory-maps a snapshot read-only and wraps it in a CompactIndex.
+    Without `verify` only the JSON header is parsed; vectors and texts are paged in on use.
+    """
+    header, data_start = read_header(path)
+    if header["embedding_model"] != EMBEDDING_MODEL:
+        raise ValueError(f"Snapshot was built with '{header['embedding_model']}', but queries are embedded with '{EMBEDDING_MODEL}'.")
+    sections = _map_sections(path, header, data_start)
+    if verify:
+        _verify_sections(path, header, sections)
+    return CompactIndex(
+        header,
+        full=sections["vectors_f32"],
+        codes=sections["codes"],
+        scales=sections.get("scales"),
+        act_codes=sections["act_codes"],
+        chunks=SnapshotChunks(sections),
+    )
+
+
+def install_snapshot(source_path: str, target_path: str) -> Dict[str, Any]:
+    """Verifies a snapshot and atomically copies it to `target_path`."""
+    header = verify_snapshot(source_path)
+    temp_path = f"{target_path}.tmp"
+    with open(source_path, "rb") as src, open(temp_path, "wb") as dst:
+        while True:
+            block = src.read(1 << 20)
+            if not block:
+                break
+            dst.write(block)
+    os.replace(temp_path, target_path)
+    return header
+
@@ -0,0 +1,179 @@
+# FILE: app/services/job_queue.py
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.legalchatbot import AdaptiveLegalChatbot, stage_listener
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobStore(ABC):
+    """
+    Storage interface for job records.
+    Records are plain JSON-serializable dicts so a shared store (e.g. Redis)
+    can replace the in-memory one without touching the job manager.
+    API keys are never part of a record.
+    """
+
+    @abstractmethod
+    def create(self, record: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def update(self, job_id: str, **fields: Any) -> None: ...
+
+    @abstractmethod
+    def append_stage(self, job_id: str, stage: str, details: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def purge_finished_before(self, cutoff: float) -> int: ...
+
+
+class InMemoryJobStore(JobStore):
+    """Process-local job store. Jobs are lost on restart and not shared between workers."""
+
+    def __init__(self):
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._records[record["job_id"]] = record
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get(job_id)
+            if record is None:
+                return None
+            return {**record, "stages": list(record["stages"])}
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            if job_id in self._records:
+                self._records[job_id].update(fields)
+
+    def append_stage(self, job_id: str, stage: str, details: Dict[str, Any]) -> None:
+        with self._lock:
+            record = self._records.get(job_id)
+            if record is not None:
+                record["stage"] = stage
+                record["stages"].append({"stage": stage, "at": time.time(), **details})
+
+    def purge_finished_before(self, cutoff: float) -> int:
+        with self._lock:
+            expired = [job_id for job_id, record in self._records.items() if record.get("finished_at") and record["finished_at"] < cutoff]
+            for job_id in expired:
+                del self._records[job_id]
+            return len(expired)
+
+
+class JobManager:
+    """
+    Runs `ask_structured` calls on a pool of background asyncio workers.
+    Submissions return immediately with a job id; callers poll for status,
+    stage progress and the final AdaptiveResponse.
+    """
+
+    def __init__(
+        self,
+        chatbot: AdaptiveLegalChatbot,
+        store: Optional[JobStore] = None,
+        workers: int = settings.JOB_WORKERS,
+        max_queued: int = settings.JOB_MAX_QUEUED,
+        result_ttl_seconds: float = settings.JOB_RESULT_TTL_SECONDS,
+    ):
+        self.chatbot = chatbot
+        self.store = store if store is not None else InMemoryJobStore()
+        self.workers = workers
+        self.result_ttl_seconds = result_ttl_seconds
+        # API keys only live in this local queue, never in the store
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._tasks: List[asyncio.Task] = []
+
+    def _ensure_workers(self) -> None:
+        # Workers are started lazily so they bind to the running event loop
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def purge_expired(self) -> int:
+        return self.store.purge_finished_before(time.time() - self.result_ttl_seconds)
+
+    async def submit(self, query: str, session_id: str, google_api_key: str, cohere_api_key: str, tavily_api_key: str) -> Dict[str, Any]:
+        self._ensure_workers()
+        self.purge_expired()
+
+        job_id = str(uuid.uuid4())
+        record = {
+            "job_id": job_id,
+            "session_id": session_id,
+            "status": "queued",
+            "stage": "queued",
+            "stages": [],
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        payload = {
+            "query": query,
+            "session_id": session_id,
+            "google_api_key": google_api_key,
+            "cohere_api_key": cohere_api_key,
+            "tavily_api_key": tavily_api_key,
+        }
+        try:
+            self._queue.put_nowait((job_id, payload))
+        except asyncio.QueueFull:
+            raise JobQueueFullError(f"Too many queued jobs (limit {self._queue.maxsize}). Please retry later.")
+        self.store.create(record)
+        return record
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self.purge_expired()
+        return self.store.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, payload = await self._queue.get()
+            try:
+                await self._run_job(job_id, payload)
+            except Exception as e:
+                logging.error(f"Job {job_id} crashed: {e}", exc_info=True)
+                self.store.update(job_id, status="failed", finished_at=time.time(), error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str, payload: Dict[str, Any]) -> None:
+        self.store.update(job_id, status="running", started_at=time.time())
+        token = stage_listener.set(lambda stage, details: self.store.append_stage(job_id, stage, details))
+        try:
+            response = await self.chatbot.ask_structured(**payload)
+        finally:
+            stage_listener.reset(token)
+
+        failed = response.response_type == "error"
+        self.store.update(
+            job_id,
+            status="failed" if failed else "completed",
+            stage="done",
+            finished_at=time.time(),
+            result=response.model_dump(),
+            error=response.response if failed else None,
+        )
+
+    def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
@@ -1,31 +1,115 @@
 # FILE: legalchatbot.py (MODIFIED FOR ENHANCED LOGGING AND SAFETY)
+import asyncio
 import datetime
+import hashlib
 import re
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 
 from app.core.llm import get_gemini, get_gemini_for_routing, get_gemini_for_conversation
 from app.schemas.chatbot_schemas import AdaptiveResponse, LegalResponse, ApiKeyChatQuery
 from app.services.chatbot_prompt import ROUTER_PROMPT, GENERAL_PROMPT
 from app.services.planner_prompt import PLANNER_PROMPT_TEMPLATE
+from app.services.plan_cache import PlanCache, normalize_query
+from app.services.session_index import IndexedChatMessageHistory, SessionIndex
+from app.services.vector_store import ACT_PARTITIONS, get_embeddings, preload_index, retrieve
 from app.core.config import settings
 
 from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
 from langchain_core.runnables import Runnable, RunnableBranch, RunnableLambda, RunnableParallel, RunnablePassthrough
 from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_community.chat_message_histories import ChatMessageHistory
-from langchain_cohere import CohereEmbeddings
-from langchain_chroma import Chroma
+from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from pydantic import BaseModel, Field
-from langchain_tavily import TavilySearch
+# Provider SDKs (Cohere, Chroma, Tavily, Gemini) are imported lazily on first
+# use to keep them off the cold-start path; see warmup() to preload them.
+
+
+# Optional per-request listener told when the pipeline moves to a new stage
+# (used by the job API to expose progress). Context variables follow the
+# request into LangChain's executor threads, so sync steps can report too.
+stage_listener: ContextVar[Optional[Callable[[str, Dict[str, Any]], None]]] = ContextVar("stage_listener", default=None)
+
+
+def report_stage(stage: str, **details: Any) -> None:
+    listener = stage_listener.get()
+    if listener is not None:
+        listener(stage, details)
+
+
+@contextmanager
+def collect_stage_details(stage: str) -> Iterator[Dict[str, Any]]:
+    """
+    Captures the details reported for `stage` during the block, while still
+    forwarding every stage to any outer listener (e.g. a job's progress log).
+    """
+    collected: Dict[str, Any] = {}
+    parent = stage_listener.get()
+
+    def listener(name: str, details: Dict[str, Any]) -> None:
+        if name == stage:
+            collected.update(details)
+        if parent is not None:
+            parent(name, details)
+
+    token = stage_listener.set(listener)
+    try:
+        yield collected
+    finally:
+        stage_listener.reset(token)
+
+
+class SharedRun:
+    """
+    One pipeline run awaited by several callers. Stage events are recorded on
+    the run and delivered to every caller's listener, so callers that join
+    late are replayed the stages they missed.
+    """
+
+    def __init__(self):
+        self.task: Optional[asyncio.Future] = None
+        self._events: List[Tuple[str, Dict[str, Any]]] = []
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        # Stages are reported from LangChain's executor threads as well as the event loop
+        self._lock = threading.Lock()
+
+    def dispatch(self, stage: str, details: Dict[str, Any]) -> None:
+        with self._lock:
+            self._events.append((stage, details))
+            for listener in list(self._listeners):
+                listener(stage, details)
+
+    def subscribe(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        with self._lock:
+            for stage, details in self._events:
+                listener(stage, details)
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+def api_key_digest(*api_keys: str) -> str:
+    """Stable digest of a caller's API keys, so the keys themselves are not kept as coalescing keys."""
+    return hashlib.sha256("\0".join(key or "" for key in api_keys).encode("utf-8")).hexdigest()
 
 
 class AdaptiveLegalChatbot:
-    def __init__(self, history_store: Optional[Dict] = None):
+    def __init__(self, history_store: Optional[Dict] = None, plan_cache: Optional[PlanCache] = None, session_index: Optional[SessionIndex] = None):
         """
-        Initializes the AdaptiveLegalChatbot service with a history store.
+        Initializes the AdaptiveLegalChatbot service with a history store,
+        its session index and an (optionally shared) planner cache.
         """
         self.store = history_store if history_store is not None else {}
+        self.session_index = session_index if session_index is not None else SessionIndex()
+        self.plan_cache = plan_cache if plan_cache is not None else PlanCache()
+        # In-flight pipeline runs keyed by (session_id, normalized query, API key digest)
+        self._inflight: Dict[Tuple[str, str, str], SharedRun] = {}
 
         # Pydantic schema for the planner chain output
         class ActionPlan(BaseModel):
@@ -33,12 +117,15 @@ class AdaptiveLegalChatbot:
             direct_answer_possible: bool = Field(description="True if the query is general and does not require RAG or Web Search.")
             rag_query: Optional[str] = Field(default=None, description="A single, highly specific query for local document search (RAG).")
             web_query: Optional[str] = Field(default=None, description="A single, precise query for web search (Tavily).")
+            target_acts: Optional[List[str]] = Field(default=None, description=f"Acts the rag_query is about, used to scope local document search. Allowed values: {', '.join(ACT_PARTITIONS)}. Leave empty if unsure or if other acts may be relevant.")
         
         self.action_plan_parser = JsonOutputParser(pydantic_object=ActionPlan)
+        self._format_instructions: Optional[str] = None
         self.planner_prompt = PromptTemplate(
             template=PLANNER_PROMPT_TEMPLATE,
             input_variables=["input", "chat_history", "current_date"],
-            partial_variables={"format_instructions": self.action_plan_parser.get_format_instructions()},
+            # Resolved (and cached) on first format instead of at construction
+            partial_variables={"format_instructions": self._planner_format_instructions},
         )
         self.router_prompt = ROUTER_PROMPT
         self.general_prompt = GENERAL_PROMPT
@@ -105,6 +192,32 @@ class AdaptiveLegalChatbot:
         Factory method to construct the full conversational chain
         using user-provided API keys.
         """
+        stages = self._build_chain_stages(google_api_key, cohere_api_key, tavily_api_key)
+
+        legal_chain = RunnablePassthrough.assign(plan=stages["planner"]) | stages["answer_from_plan"]
+
+        branch = RunnableBranch(
+            (lambda x: "legal_query" in x["topic"], legal_chain),
+            stages["general"]
+        )
+
+        full_chain = {
+            "topic": stages["router"],
+            "input": lambda x: x["input"],
+            "chat_history": lambda x: x["chat_history"],
+            "current_date": lambda x: datetime.date.today().isoformat()
+        } | RunnableLambda(self._log_router_decision_func) | branch # Step 1
+        
+        return full_chain
+
+    def _build_chain_stages(self, google_api_key: str, cohere_api_key: str, tavily_api_key: str, query_vectors: Optional[Dict[str, List[float]]] = None) -> Dict[str, Any]:
+        """
+        Builds the individual pipeline stages (router, planner, research/synthesis,
+        general) so they can be composed into the full chain or driven step by step.
+        `query_vectors` maps RAG queries to precomputed embeddings; matching queries
+        skip their own embedding call.
+        """
+        query_vectors = query_vectors if query_vectors is not None else {}
         try:
             # LLM Initialization
             planner_model = get_gemini_for_routing(google_api_key=google_api_key, temperature=0.0)
@@ -115,10 +228,11 @@ class AdaptiveLegalChatbot:
             # Tool Initialization
             embeddings = None
             if cohere_api_key and cohere_api_key.strip():
-                embeddings = CohereEmbeddings(model="embed-english-v3.0", cohere_api_key=cohere_api_key)
+                embeddings = get_embeddings(cohere_api_key)
             
             web_search_tool = None
             if tavily_api_key and tavily_api_key.strip():
+                from langchain_tavily import TavilySearch
                 web_search_tool = TavilySearch(max_results=3, tavily_api_key=tavily_api_key)
             
         except Exception as e:
@@ -129,12 +243,12 @@ class AdaptiveLegalChatbot:
         if not embeddings:
             raise ValueError("Cohere API key is mandatory for RAG functionality. Please provide the Cohere API Key.")
 
-        retriever = Chroma(persist_directory=settings.CHROMA_DB_PATH, embedding_function=embeddings).as_retriever(search_kwargs={"k": 5})
-
         # --- NEW LOGGING HELPERS ---
-        def retrieve_from_local_docs(query: str) -> str:
+        def retrieve_from_local_docs(query: str, acts: Optional[List[str]] = None) -> str:
             try:
-                docs = retriever.invoke(query)
+                query_vector = query_vectors.get(query) or embeddings.embed_query(query)
+                docs, report = retrieve(query_vector, k=settings.RETRIEVAL_K, acts=acts)
+                report_stage("retrieval", **report)
                 return "\n\n---\n\n".join([doc.page_content for doc in docs])
             except Exception as e:
                 return "Error: Could not retrieve local documents."
@@ -149,10 +263,32 @@ class AdaptiveLegalChatbot:
                 return "Error: Could not retrieve web search results."
 
         def log_synthesis_start(data):
+            report_stage("synthesis")
             return data
         # --- END NEW LOGGING HELPERS ---
 
         planner_chain = self.planner_prompt | planner_model | self.action_plan_parser
+
+        # --- PLAN CACHE ---
+        # Identical (query, recent history, date) inputs produce identical plans,
+        # so a cache hit skips the planner LLM call and research starts immediately.
+        def plan_with_cache(x: dict) -> dict:
+            key = self.plan_cache.make_key(x["input"], x.get("chat_history"), x["current_date"])
+            plan = self.plan_cache.get(key)
+            if plan is None:
+                plan = planner_chain.invoke(x)
+                self.plan_cache.put(key, plan)
+            return plan
+
+        async def aplan_with_cache(x: dict) -> dict:
+            key = self.plan_cache.make_key(x["input"], x.get("chat_history"), x["current_date"])
+            plan = self.plan_cache.get(key)
+            if plan is None:
+                plan = await planner_chain.ainvoke(x)
+                self.plan_cache.put(key, plan)
+            return plan
+
+        cached_planner_chain = RunnableLambda(plan_with_cache, afunc=aplan_with_cache)
         
         synthesizer_chain = self.synthesizer_prompt | synthesizer_model | StrOutputParser()
 
@@ -160,7 +296,7 @@ class AdaptiveLegalChatbot:
             # This is now STEP 4
             research_steps = {}
             if plan.get("rag_query"):
-                research_steps["rag_results"] = RunnableLambda(lambda x: retrieve_from_local_docs(plan["rag_query"]))
+                research_steps["rag_results"] = RunnableLambda(lambda x: retrieve_from_local_docs(plan["rag_query"], plan.get("target_acts")))
             else:
                 research_steps["rag_results"] = RunnableLambda(lambda x: "Not used.")
 
@@ -183,6 +319,7 @@ class AdaptiveLegalChatbot:
             plan = plan_and_input["plan"]
             
             if plan.get("direct_answer_possible"):
+                report_stage("synthesis", path="LLM-Only Path")
                 return (
                     RunnableLambda(lambda x: synthesizer_chain.invoke({
                         "input": x["input"], 
@@ -203,37 +340,65 @@ class AdaptiveLegalChatbot:
                 elif web_planned:
                     path_desc += " (Web Search + LLM)"
                 
+                report_stage("research", path=path_desc)
                 return research_and_synthesis_chain
 
-        legal_chain = (
-            RunnablePassthrough.assign(plan=planner_chain)
-            | RunnableLambda(self._log_action_plan_func) # Step 2
+        answer_from_plan = (
+            RunnableLambda(self._log_action_plan_func) # Step 2
             | RunnableLambda(route_final_answer) # Step 3
         )
 
         general_chain = self.general_prompt | general_model | StrOutputParser()
         router_chain = self.router_prompt | router_model | StrOutputParser()
 
-        branch = RunnableBranch(
-            (lambda x: "legal_query" in x["topic"], legal_chain),
-            general_chain
-        )
-
-        full_chain = {
-            "topic": router_chain,
-            "input": lambda x: x["input"],
-            "chat_history": lambda x: x["chat_history"],
-            "current_date": lambda x: datetime.date.today().isoformat()
-        } | RunnableLambda(self._log_router_decision_func) | branch # Step 1
-        
-        return full_chain
+        return {
+            "router": router_chain,
+            "planner": cached_planner_chain,
+            "answer_from_plan": answer_from_plan,
+            "general": general_chain,
+            "embeddings": embeddings,
+        }
 
     async def ask(self, query: str, session_id: str, google_api_key: str, cohere_api_key: str, tavily_api_key: str) -> str:
         """
         Internal method to invoke the chain.
         Requires API keys to build and run the chain.
+        Duplicate requests for the same session and (normalized) query that
+        arrive while the first one is still running await its result instead
+        of running the pipeline, and writing history, a second time.
         """
+        key = (session_id, normalize_query(query), api_key_digest(google_api_key, cohere_api_key, tavily_api_key))
+        run = self._inflight.get(key)
+        if run is None:
+            run = SharedRun()
+            run.task = asyncio.ensure_future(self._run_shared(run, query, session_id, google_api_key, cohere_api_key, tavily_api_key))
+            self._inflight[key] = run
+
+            def _forget(done_task: asyncio.Future) -> None:
+                if self._inflight.get(key) is run:
+                    del self._inflight[key]
+
+            run.task.add_done_callback(_forget)
+
+        listener = stage_listener.get()
+        if listener is not None:
+            run.subscribe(listener)
+        try:
+            # Shielded so one caller disconnecting does not cancel the run for the others
+            return await asyncio.shield(run.task)
+        finally:
+            if listener is not None:
+                run.unsubscribe(listener)
+
+    async def _run_shared(self, run: SharedRun, query: str, session_id: str, google_api_key: str, cohere_api_key: str, tavily_api_key: str) -> str:
+        # The task has its own copy of the context, so this only routes this run's stages
+        stage_listener.set(run.dispatch)
+        return await self._run_conversation(query, session_id, google_api_key, cohere_api_key, tavily_api_key)
+
+    async def _run_conversation(self, query: str, session_id: str, google_api_key: str, cohere_api_key: str, tavily_api_key: str) -> str:
+        """Builds the chain and runs one exchange, appending it to the session history."""
         try:
+            report_stage("routing")
             chain = self._build_full_chain(google_api_key, cohere_api_key, tavily_api_key)
             
             conversational_chain = RunnableWithMessageHistory(
@@ -255,16 +420,132 @@ class AdaptiveLegalChatbot:
         Accepts query, session, and API keys, then returns a structured response.
         """
         try:
-            response_text = await self.ask(query, session_id, google_api_key, cohere_api_key, tavily_api_key)
+            with collect_stage_details("retrieval") as retrieval:
+                response_text = await self.ask(query, session_id, google_api_key, cohere_api_key, tavily_api_key)
             
             if "I apologize, but I encountered an issue" in response_text:
                 raise Exception(response_text)
                 
             metadata = self.get_response_metadata(query, response_text, session_id)
+            if retrieval:
+                # Chunks sent to the synthesizer and prompt tokens saved by diversification
+                metadata["retrieval"] = dict(retrieval)
             return AdaptiveResponse(response=response_text, session_id=session_id, response_type="adaptive", metadata=metadata)
         except Exception as e:
             return AdaptiveResponse(response=str(e), session_id=session_id, response_type="error", metadata={"error": str(e)})
 
+    async def ask_batch(self, queries: List[str], google_api_key: str, cohere_api_key: str, tavily_api_key: str, max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Answers a list of independent queries with one shared chain build.
+        Identical queries (after normalization) are answered once, all planned
+        RAG queries are embedded in a single Cohere call, and the LLM stages run
+        with bounded concurrency. Results are returned in input order, with
+        per-item errors instead of failing the whole batch.
+        Batch items are stateless: nothing is written to session history.
+        """
+        limit = max(1, min(max_concurrency or settings.BATCH_MAX_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY))
+        semaphore = asyncio.Semaphore(limit)
+
+        # Dedupe while remembering which input positions share an answer
+        unique_queries: Dict[str, str] = {}
+        for query in queries:
+            unique_queries.setdefault(normalize_query(query), query)
+
+        query_vectors: Dict[str, List[float]] = {}
+        stages = self._build_chain_stages(google_api_key, cohere_api_key, tavily_api_key, query_vectors=query_vectors)
+        current_date = datetime.date.today().isoformat()
+
+        async def plan_item(query: str) -> Dict[str, Any]:
+            inputs = {"input": query, "chat_history": [], "current_date": current_date}
+            async with semaphore:
+                inputs["topic"] = await stages["router"].ainvoke(inputs)
+                if "legal_query" in inputs["topic"]:
+                    inputs["plan"] = await stages["planner"].ainvoke(inputs)
+            return inputs
+
+        async def answer_item(inputs: Dict[str, Any]) -> str:
+            async with semaphore:
+                if "plan" in inputs:
+                    return await stages["answer_from_plan"].ainvoke(inputs)
+                return await stages["general"].ainvoke(inputs)
+
+        keys = list(unique_queries.keys())
+        planned = await asyncio.gather(*(plan_item(unique_queries[k]) for k in keys), return_exceptions=True)
+
+        # One embedding call for every RAG query the planner asked for
+        rag_queries = list(dict.fromkeys(
+            item["plan"]["rag_query"]
+            for item in planned
+            if isinstance(item, dict) and isinstance(item.get("plan"), dict)
+            and not item["plan"].get("direct_answer_possible") and item["plan"].get("rag_query")
+        ))
+        if rag_queries:
+            try:
+                vectors = await asyncio.to_thread(stages["embeddings"].embed, rag_queries, input_type="search_query")
+                query_vectors.update(zip(rag_queries, vectors))
+            except Exception:
+                # Fall back to per-query embedding inside retrieve_from_local_docs
+                pass
+
+        async def finish_item(item: Any) -> Tuple[Any, Dict[str, Any]]:
+            if isinstance(item, Exception):
+                return item, {}
+            # Each gathered item runs in its own task, so listeners do not mix
+            with collect_stage_details("retrieval") as retrieval:
+                try:
+                    return await answer_item(item), retrieval
+                except Exception as e:
+                    return e, retrieval
+
+        answers = dict(zip(keys, await asyncio.gather(*(finish_item(item) for item in planned))))
+
+        results = []
+        for index, query in enumerate(queries):
+            answer, retrieval = answers[normalize_query(query)]
+            if isinstance(answer, Exception):
+                results.append({"index": index, "query": query, "response": None, "response_type": "error", "metadata": {"error": str(answer)}, "error": str(answer)})
+            else:
+                metadata = self.get_response_metadata(query, answer, session_id="")
+                if retrieval:
+                    metadata["retrieval"] = dict(retrieval)
+                results.append({"index": index, "query": query, "response": answer, "response_type": "adaptive", "metadata": metadata, "error": None})
+        return results
+
+    def _planner_format_instructions(self) -> str:
+        if self._format_instructions is None:
+            self._format_instructions = self.action_plan_parser.get_format_instructions()
+        return self._format_instructions
+
+    def warmup(self) -> Dict[str, float]:
+        """
+        Pays one-off costs ahead of the first request: imports the provider
+        SDKs, opens the vector index, renders every prompt template once and
+        builds the planner format instructions. Returns seconds per phase.
+        """
+        timings: Dict[str, float] = {}
+
+        def timed(phase: str, func: Callable[[], Any]) -> None:
+            started = time.perf_counter()
+            func()
+            timings[phase] = time.perf_counter() - started
+
+        def import_providers() -> None:
+            import langchain_chroma, langchain_cohere, langchain_google_genai, langchain_tavily  # noqa: F401
+
+        def render_prompts() -> None:
+            sample = {"input": "warmup", "chat_history": [], "current_date": datetime.date.today().isoformat()}
+            self.planner_prompt.format(**sample)
+            self.router_prompt.format_messages(**sample)
+            self.general_prompt.format_messages(**sample)
+            self.synthesizer_prompt.format_messages(input="warmup", rag_results="", web_results="")
+
+        timed("import_providers", import_providers)
+        # Recorded by preload_index itself as "load_index", shared with the other loading paths
+        preload_index()
+        timed("planner_format_instructions", self._planner_format_instructions)
+        timed("render_prompts", render_prompts)
+        return timings
+
     # --- MODIFIED LOGGING FUNCTIONS ---
 
     def _log_action_plan_func(self, data):
@@ -277,13 +558,17 @@ class AdaptiveLegalChatbot:
         
         # Log for general conversation
         if "general_conversation" in x.get('topic'):
-            pass
+            report_stage("general_answer", topic="general_conversation")
+        else:
+            report_stage("planning", topic="legal_query")
         return x
 
     # --- UNMODIFIED HELPER FUNCTIONS ---
 
-    def get_session_history(self, session_id: str) -> ChatMessageHistory:
-        if session_id not in self.store: self.store[session_id] = ChatMessageHistory()
+    def get_session_history(self, session_id: str) -> BaseChatMessageHistory:
+        if session_id not in self.store:
+            self.store[session_id] = IndexedChatMessageHistory(session_id=session_id, index=self.session_index)
+            self.session_index.record_write(session_id)
         return self.store[session_id]
 
     def analyze_query_type(self, query: str) -> str:
@@ -303,15 +588,24 @@ class AdaptiveLegalChatbot:
         return list(self.store.keys())
 
     def get_sessions_with_titles(self) -> List[Dict[str, str]]:
-        session_list = []
-        for session_id, history in self.store.items():
-            title = f"Chat {session_id[:8]}..."
-            for message in history.messages:
-                if message.__class__.__name__ == "HumanMessage" and message.content:
-                    title = message.content[:40] + "..." if len(message.content) > 40 else message.content
-                    break
-            session_list.append({"id": session_id, "title": title})
-        return session_list
+        sessions, _ = self.list_sessions()
+        return sessions
+
+    def list_sessions(self, limit: Optional[int] = None, after: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Returns a newest-first page of sessions from the index, plus the next cursor."""
+        return self.session_index.page(limit=limit, after=after)
+
+    def session_exists(self, session_id: str) -> bool:
+        return session_id in self.store
+
+    def get_session_version(self, session_id: str) -> Optional[str]:
+        """
+        Identifies the current contents of a session for history ETags: the
+        creation time of this session instance plus a write counter that is
+        never reused, even after the session is deleted and recreated.
+        """
+        entry = self.session_index.get(session_id)
+        return f"{entry['created_at']!r}-{entry['version']}" if entry else None
 
     def get_session_messages(self, session_id: str) -> List[Dict[str, Any]]:
         if session_id not in self.store: return []
@@ -319,6 +613,22 @@ class AdaptiveLegalChatbot:
         for message in self.store[session_id].messages: formatted_messages.append({"type": "user" if message.__class__.__name__ == "HumanMessage" else "ai", "content": message.content})
         return formatted_messages
 
+    def get_session_messages_page(self, session_id: str, limit: int, after: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Pages through a session's history from the newest message backwards.
+        The cursor is the position of the oldest message already returned;
+        each page is kept in chronological order so clients can prepend it.
+        """
+        messages = self.store[session_id].messages if session_id in self.store else []
+        end = len(messages)
+        if after is not None:
+            if not after.isdigit() or int(after) > len(messages):
+                raise ValueError("Invalid pagination cursor.")
+            end = int(after)
+        start = max(0, end - limit)
+        page = [{"type": "user" if message.__class__.__name__ == "HumanMessage" else "ai", "content": message.content} for message in messages[start:end]]
+        return page, (str(start) if start > 0 else None)
+
     def clear_session_history(self, session_id: str) -> bool:
         if session_id in self.store:
             self.store[session_id].clear()
@@ -328,20 +638,22 @@ class AdaptiveLegalChatbot:
     def delete_session(self, session_id: str) -> bool:
         if session_id in self.store:
             del self.store[session_id]
+            self.session_index.remove(session_id)
             return True
         return False
 
     def clear_all_histories(self):
         try:
             self.store.clear()
+            self.session_index.clear()
         except Exception as e: pass
 
 
 class LegalChatbot(AdaptiveLegalChatbot):
     """Legacy class name for backward compatibility."""
 
-    def __init__(self, history_store: Optional[Dict] = None):
-        super().__init__(history_store=history_store)
+    def __init__(self, history_store: Optional[Dict] = None, plan_cache: Optional[PlanCache] = None, session_index: Optional[SessionIndex] = None):
+        super().__init__(history_store=history_store, plan_cache=plan_cache, session_index=session_index)
     
     async def ask(self, query: str, session_id: str, google_api_key: str, cohere_api_key: str, tavily_api_key: str) -> LegalResponse:
         """
@@ -0,0 +1,109 @@
+# FILE: app/services/plan_cache.py
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes a user query so trivially different spellings of the same
+    question ("What is Article 21?" / "what is article 21") share one key.
+    """
+    text = re.sub(r"\s+", " ", (query or "").strip().lower())
+    return text.rstrip(" ?!.")
+
+
+def history_digest(chat_history: Optional[List[Any]], window: int) -> str:
+    """
+    Returns a short, stable digest of the last `window` messages.
+    The planner resolves pronouns against the history, so two identical
+    queries only share a plan when their recent context matches too.
+    """
+    hasher = hashlib.sha256()
+    for message in (chat_history or [])[-window:] if window > 0 else []:
+        hasher.update(message.__class__.__name__.encode("utf-8"))
+        hasher.update(b"\x00")
+        hasher.update(str(getattr(message, "content", message)).encode("utf-8"))
+        hasher.update(b"\x01")
+    return hasher.hexdigest()[:16]
+
+
+class PlanCache:
+    """
+    In-process TTL cache for planner ActionPlans.
+
+    Keys combine the normalized query, a digest of recent history and the
+    current date, so a plan never outlives the day it was made for. Plans
+    that rely on web search expire much sooner than RAG-only or direct plans.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.PLAN_CACHE_MAX_ENTRIES,
+        web_ttl_seconds: float = settings.PLAN_CACHE_WEB_TTL_SECONDS,
+        static_ttl_seconds: float = settings.PLAN_CACHE_STATIC_TTL_SECONDS,
+        history_window: int = settings.PLAN_CACHE_HISTORY_WINDOW,
+    ):
+        self.max_entries = max_entries
+        self.web_ttl_seconds = web_ttl_seconds
+        self.static_ttl_seconds = static_ttl_seconds
+        self.history_window = history_window
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def make_key(self, query: str, chat_history: Optional[List[Any]], current_date: str) -> Tuple[str, str, str]:
+        return (normalize_query(query), history_digest(chat_history, self.history_window), current_date)
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, plan = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(plan)
+
+    def put(self, key: Tuple[str, str, str], plan: Dict[str, Any]) -> None:
+        if not self.enabled or not isinstance(plan, dict):
+            return
+        ttl = self.web_ttl_seconds if plan.get("web_query") else self.static_ttl_seconds
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, dict(plan))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -57,6 +57,7 @@ Analyze the user's input and available context to decide the best strategy by fo
 -   **Bad Query:** "latest update" (if user asked "what's new with that law?")
 -   **Good Query:** "latest updates and implementation status of the [Resolved Law Name from History]"
 -   **[NEW] Good Query:** "admissibility of digital evidence under Indian Evidence Act and IT Act" (if user asks "can police use my phone data?")
+-   When the `rag_query` is clearly about specific acts, list them in `target_acts` using only the allowed values from the schema (e.g. `["evidence_act", "it_act"]` for the query above). Leave `target_acts` empty when you are unsure, so all documents are searched.
 
 **Combination Rule (Use Multiple Tools)**
 -   You **MUST** use both RAG and Web search if the query is complex and meets the criteria for both.
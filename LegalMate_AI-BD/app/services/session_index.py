@@ -0,0 +1,139 @@
+# FILE: app/services/session_index.py
+
+import base64
+import bisect
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.messages import BaseMessage
+from pydantic import Field
+
+TITLE_MAX_CHARS = 40
+
+
+def default_title(session_id: str) -> str:
+    return f"Chat {session_id[:8]}..."
+
+
+def make_title(text: str) -> str:
+    return text[:TITLE_MAX_CHARS] + "..." if len(text) > TITLE_MAX_CHARS else text
+
+
+class SessionIndex:
+    """
+    Keeps per-session title, last-activity and version data up to date on
+    every history write, so listing sessions never has to scan messages.
+
+    Sessions are held in a list sorted newest-first, which makes cursor
+    pagination a binary search plus a slice.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # Sorted ascending by (-last_activity, session_id), i.e. newest first
+        self._order: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        # Versions come from one counter that never resets, so a session that is
+        # deleted and recreated under the same id never reuses an old version
+        self._versions = itertools.count(1)
+
+    @staticmethod
+    def _sort_key(entry: Dict[str, Any]) -> Tuple[float, str]:
+        return (-entry["last_activity"], entry["id"])
+
+    def _remove_key(self, key: Tuple[float, str]) -> None:
+        position = bisect.bisect_left(self._order, key)
+        if position < len(self._order) and self._order[position] == key:
+            del self._order[position]
+
+    def _reposition(self, entry: Dict[str, Any], old_key: Optional[Tuple[float, str]]) -> None:
+        if old_key is not None:
+            self._remove_key(old_key)
+        bisect.insort(self._order, self._sort_key(entry))
+
+    def record_write(self, session_id: str, message: Optional[BaseMessage] = None, cleared: bool = False) -> None:
+        """Registers a session creation, appended message or history clear."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            old_key = self._sort_key(entry) if entry else None
+            if entry is None:
+                entry = {"id": session_id, "title": default_title(session_id), "has_title": False, "message_count": 0, "version": 0, "created_at": time.time()}
+                self._entries[session_id] = entry
+            if cleared:
+                entry.update(title=default_title(session_id), has_title=False, message_count=0)
+            if message is not None:
+                entry["message_count"] += 1
+                if not entry["has_title"] and message.__class__.__name__ == "HumanMessage" and message.content:
+                    entry["title"] = make_title(message.content)
+                    entry["has_title"] = True
+            entry["version"] = next(self._versions)
+            entry["last_activity"] = time.time()
+            self._reposition(entry, old_key)
+
+    def remove(self, session_id: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self._remove_key(self._sort_key(entry))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._order.clear()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            return dict(entry) if entry else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def encode_cursor(key: Tuple[float, str]) -> str:
+        return base64.urlsafe_b64encode(f"{key[0]!r}|{key[1]}".encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[float, str]:
+        try:
+            negative_ts, session_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+            return (float(negative_ts), session_id)
+        except Exception:
+            raise ValueError("Invalid pagination cursor.")
+
+    def page(self, limit: Optional[int] = None, after: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Returns sessions newest-first, starting after the `after` cursor.
+        With no limit, every remaining session is returned.
+        """
+        start_key = self.decode_cursor(after) if after else None
+        with self._lock:
+            start = bisect.bisect_right(self._order, start_key) if start_key else 0
+            end = len(self._order) if limit is None else min(len(self._order), start + limit)
+            keys = self._order[start:end]
+            items = [
+                {k: self._entries[session_id][k] for k in ("id", "title", "last_activity", "message_count")}
+                for _, session_id in keys
+            ]
+            next_cursor = self.encode_cursor(keys[-1]) if keys and end < len(self._order) else None
+        return items, next_cursor
+
+
+class IndexedChatMessageHistory(InMemoryChatMessageHistory):
+    """In-memory chat history that reports every write to a SessionIndex."""
+
+    session_id: str
+    index: Any = Field(default=None, exclude=True)
+
+    def add_message(self, message: BaseMessage) -> None:
+        super().add_message(message)
+        if self.index is not None:
+            self.index.record_write(self.session_id, message=message)
+
+    def clear(self) -> None:
+        super().clear()
+        if self.index is not None:
+            self.index.record_write(self.session_id, cleared=True)
@@ -0,0 +1,294 @@
+# FILE: app/services/vector_store.py
+
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Provider SDKs are imported on first use rather than at module import time,
+# which keeps them out of the application's cold-start path.
+
+EMBEDDING_MODEL = "embed-english-v3.0"
+# Backends served by CompactIndex (a compact index directory or a snapshot file)
+COMPACT_BACKENDS = ("compact", "snapshot")
+
+# --- ACT PARTITIONS ---
+# Each act is ingested into its own collection so a query about one act only
+# searches that act's chunks. Keywords are matched against the source PDF name.
+ACT_PARTITIONS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "constitution": ("Constitution of India", ("constitution",)),
+    "crpc": ("Code of Criminal Procedure, 1973", ("crpc", "criminal procedure")),
+    "ipc": ("Indian Penal Code, 1860", ("ipc", "penal code")),
+    "it_act": ("Information Technology Act, 2000", ("it act", "information technology")),
+    "evidence_act": ("Indian Evidence Act, 1872", ("evidence",)),
+    "dpdp": ("Digital Personal Data Protection Act, 2023", ("dpdp", "data protection")),
+}
+GENERAL_PARTITION = "general"
+PARTITION_COLLECTION_PREFIX = "act_"
+# Collection langchain_chroma uses when no name is given (the pre-partitioning store)
+DEFAULT_COLLECTION_NAME = "langchain"
+# ef_search chromadb < 1.0 uses for collections without hnsw:search_ef metadata
+LEGACY_CHROMA_DEFAULT_SEARCH_EF = 10
+
+_vectorstores: Dict[Optional[str], Any] = {}
+_vectorstore_lock = threading.Lock()
+_partitions: Optional[List[str]] = None
+_index_loaded = False
+_preload_lock = threading.Lock()
+_search_pool = ThreadPoolExecutor(max_workers=settings.PARTITION_SEARCH_WORKERS, thread_name_prefix="partition-search")
+
+
+def detect_act(source: str) -> str:
+    """Maps a source PDF path to its act partition, or 'general' if none matches."""
+    name = re.sub(r"[_\-.]+", " ", os.path.basename(source or "").lower())
+    for slug, (_, keywords) in ACT_PARTITIONS.items():
+        if any(re.search(rf"\b{re.escape(keyword)}\b", name) for keyword in keywords):
+            return slug
+    return GENERAL_PARTITION
+
+
+def partition_collection_name(act: str) -> str:
+    return f"{PARTITION_COLLECTION_PREFIX}{act}"
+
+
+def hnsw_collection_metadata(m: Optional[int] = settings.HNSW_M, construction_ef: Optional[int] = settings.HNSW_CONSTRUCTION_EF, search_ef: Optional[int] = settings.HNSW_SEARCH_EF) -> Dict[str, int]:
+    """
+    HNSW parameters in the collection-metadata form Chroma reads at creation time.
+    Unset values are left out so Chroma applies its own defaults.
+    """
+    metadata = {"hnsw:M": m, "hnsw:construction_ef": construction_ef, "hnsw:search_ef": search_ef}
+    return {key: value for key, value in metadata.items() if value is not None}
+
+
+def _current_search_ef(collection: Any) -> int:
+    """The ef_search a collection is actually queried with, from whichever API this chromadb reports it through."""
+    # chromadb >= 1.0: set via modify(configuration=...), never mirrored into metadata
+    configuration = getattr(collection, "configuration", None) or {}
+    ef = (configuration.get("hnsw") or {}).get("ef_search") if isinstance(configuration, dict) else None
+    if ef is not None:
+        return ef
+    return (collection.metadata or {}).get("hnsw:search_ef", LEGACY_CHROMA_DEFAULT_SEARCH_EF)
+
+
+def apply_search_ef(collection: Any, search_ef: Optional[int] = settings.HNSW_SEARCH_EF) -> None:
+    """
+    Applies the query-time HNSW breadth to an existing collection.
+    M and construction_ef are fixed once the graph is built, but search_ef can change.
+    Chroma has no per-query ef, so this persists the value. Nothing is written
+    unless HNSW_SEARCH_EF is set and differs from the collection's current value,
+    keeping read-only deploys and concurrently starting workers away from chroma.sqlite3.
+    """
+    if search_ef is None or _current_search_ef(collection) == search_ef:
+        return
+    try:
+        try:
+            collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+        except TypeError:
+            # chromadb < 1.0 has no configuration API; search_ef lives in collection metadata
+            collection.modify(metadata={**(collection.metadata or {}), "hnsw:search_ef": search_ef})
+    except Exception as e:
+        logging.warning(f"Could not apply hnsw search_ef={search_ef} to '{collection.name}': {e}")
+
+
+def get_vectorstore(collection_name: Optional[str] = None) -> Any:
+    """
+    Opens a persisted Chroma collection once per process and shares it across
+    requests. No embedding function is bound: each request embeds its own
+    queries with the caller's Cohere key and searches by vector.
+    `None` opens the default (pre-partitioning) collection.
+    """
+    if collection_name not in _vectorstores:
+        with _vectorstore_lock:
+            if collection_name not in _vectorstores:
+                from langchain_chroma import Chroma
+                kwargs = {"collection_name": collection_name} if collection_name else {}
+                vectorstore = Chroma(persist_directory=settings.CHROMA_DB_PATH, **kwargs)
+                apply_search_ef(vectorstore._collection)
+                _vectorstores[collection_name] = vectorstore
+    return _vectorstores[collection_name]
+
+
+def list_partitions(persist_directory: str) -> List[str]:
+    """Act partitions present in a persisted store (empty for a legacy, unpartitioned store)."""
+    import chromadb
+    client = chromadb.PersistentClient(path=persist_directory)
+    # Older chromadb returns Collection objects, newer returns names
+    names = [getattr(collection, "name", collection) for collection in client.list_collections()]
+    return sorted(name[len(PARTITION_COLLECTION_PREFIX):] for name in names if name.startswith(PARTITION_COLLECTION_PREFIX))
+
+
+def served_collections(persist_directory: str) -> List[Tuple[str, str]]:
+    """
+    (collection name, act) for every collection the server searches: the act
+    partitions when any exist, otherwise the default collection. A legacy
+    collection left next to the partitions is ignored, so exports and
+    benchmarks see the same chunks as serving, with no duplicates.
+    """
+    partitions = list_partitions(persist_directory)
+    return [(partition_collection_name(act), act) for act in partitions] or [(DEFAULT_COLLECTION_NAME, GENERAL_PARTITION)]
+
+
+def available_partitions() -> List[str]:
+    """Act partitions present in the configured store (empty for a legacy, unpartitioned store)."""
+    global _partitions
+    if _partitions is None:
+        with _vectorstore_lock:
+            if _partitions is None:
+                _partitions = list_partitions(settings.CHROMA_DB_PATH)
+    return _partitions
+
+
+def preload_index() -> None:
+    """
+    Loads the configured retrieval index fully, once per process, including
+    what the backend would otherwise load lazily on the first search (Chroma's
+    persisted HNSW segments and their pickled metadata, or the snapshot's
+    mapped pages). Whichever caller gets here first (startup, warmup or the
+    first query) records the load time and RSS growth as "load_index".
+    """
+    global _index_loaded
+    if _index_loaded:
+        return
+    with _preload_lock:
+        if _index_loaded:
+            return
+        from app.core.startup import startup_timings
+        with startup_timings.measure("load_index", memory=True):
+            _load_index()
+        _index_loaded = True
+    report = startup_timings.snapshot()
+    logging.info(
+        f"Loaded '{settings.RETRIEVAL_BACKEND}' index in {report['phases_ms']['load_index']} ms "
+        f"(+{report['rss_delta_mb']['load_index']} MB RSS)"
+    )
+
+
+def _load_index() -> None:
+    if settings.RETRIEVAL_BACKEND in COMPACT_BACKENDS:
+        from app.services.compact_index import get_compact_index
+        index = get_compact_index()
+        if len(index):
+            index.search(index.full[0], k=1)
+        return
+
+    for collection_name in [partition_collection_name(act) for act in available_partitions()] or [None]:
+        collection = get_vectorstore(collection_name)._collection
+        sample = collection.peek(1)
+        if sample["ids"]:
+            collection.query(query_embeddings=[list(sample["embeddings"][0])], n_results=1, include=[])
+
+
+def get_embeddings(cohere_api_key: str) -> Any:
+    """Builds a Cohere embeddings client for the given user key."""
+    from langchain_cohere import CohereEmbeddings
+    return CohereEmbeddings(model=EMBEDDING_MODEL, cohere_api_key=cohere_api_key)
+
+
+def _search_collection(collection_name: Optional[str], query_vector: List[float], k: int) -> List[Tuple[Any, float]]:
+    return get_vectorstore(collection_name).similarity_search_by_vector_with_relevance_scores(query_vector, k=k)
+
+
+def search_by_vector(query_vector: List[float], k: int = settings.RETRIEVAL_K, acts: Optional[List[str]] = None) -> List[Any]:
+    """
+    Searches only the partitions for `acts` (in parallel when there are
+    several) and merges the hits by distance. When no known act is given,
+    every partition is searched; an unpartitioned store is searched as-is.
+    With RETRIEVAL_BACKEND="compact" or "snapshot" the quantized index is used instead.
+    """
+    preload_index()
+    if settings.RETRIEVAL_BACKEND in COMPACT_BACKENDS:
+        from app.services.compact_index import get_compact_index
+        return get_compact_index().search_documents(query_vector, k=k, acts=acts)
+
+    partitions = available_partitions()
+    if not partitions:
+        return [doc for doc, _ in _search_collection(None, query_vector, k)]
+
+    targets = [act for act in dict.fromkeys(acts or []) if act in partitions] or partitions
+    if len(targets) == 1:
+        hits = _search_collection(partition_collection_name(targets[0]), query_vector, k)
+    else:
+        futures = [_search_pool.submit(_search_collection, partition_collection_name(act), query_vector, k) for act in targets]
+        hits = [hit for future in futures for hit in future.result()]
+    # Chroma reports distances, so smaller is closer
+    hits.sort(key=lambda hit: hit[1])
+    return [doc for doc, _ in hits[:k]]
+
+
+# --- DIVERSIFIED RETRIEVAL ---
+
+def search_candidates(query_vector: List[float], fetch_k: int, acts: Optional[List[str]] = None) -> Tuple[List[Any], Any]:
+    """
+    Over-fetches up to `fetch_k` candidates together with their embeddings,
+    honouring the same backend and act scoping rules as search_by_vector.
+    """
+    import numpy as np
+    from langchain_core.documents import Document
+
+    preload_index()
+    if settings.RETRIEVAL_BACKEND in COMPACT_BACKENDS:
+        from app.services.compact_index import get_compact_index
+        index = get_compact_index()
+        rows = [row for row, _ in index.search(query_vector, k=fetch_k, acts=acts)]
+        docs = [Document(page_content=index.chunks[row]["text"], metadata=index.chunks[row]["metadata"]) for row in rows]
+        return docs, np.asarray(index.full[rows], dtype=np.float32) if rows else np.empty((0, 0), dtype=np.float32)
+
+    partitions = available_partitions()
+    targets = [act for act in dict.fromkeys(acts or []) if act in partitions] or partitions
+    collection_names = [partition_collection_name(act) for act in targets] or [None]
+
+    def query_collection(collection_name: Optional[str]) -> List[Tuple[float, Any, List[float]]]:
+        result = get_vectorstore(collection_name)._collection.query(
+            query_embeddings=[list(query_vector)], n_results=fetch_k, include=["documents", "metadatas", "distances", "embeddings"]
+        )
+        return [
+            (distance, Document(page_content=text or "", metadata=metadata or {}), embedding)
+            for distance, text, metadata, embedding in zip(result["distances"][0], result["documents"][0], result["metadatas"][0], result["embeddings"][0])
+        ]
+
+    futures = [_search_pool.submit(query_collection, name) for name in collection_names]
+    hits = sorted((hit for future in futures for hit in future.result()), key=lambda hit: hit[0])[:fetch_k]
+    return [doc for _, doc, _ in hits], np.asarray([embedding for _, _, embedding in hits], dtype=np.float32)
+
+
+def retrieve(query_vector: List[float], k: int = settings.RETRIEVAL_K, acts: Optional[List[str]] = None) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Returns the chunks to put in the synthesizer prompt plus a small report.
+    In "mmr" mode candidates are over-fetched, weak matches are dropped by an
+    adaptive score cutoff and the rest are diversified with MMR, so fewer,
+    less redundant chunks reach the prompt.
+    """
+    from app.services.diversify import cosine_similarities, estimate_tokens, mmr_select, relevance_cutoff
+
+    if settings.RETRIEVAL_MODE != "mmr":
+        docs = search_by_vector(query_vector, k=k, acts=acts)
+        tokens = sum(estimate_tokens(doc.page_content) for doc in docs)
+        return docs, {"mode": "similarity", "candidates": len(docs), "chunks_returned": len(docs), "prompt_tokens": tokens, "prompt_tokens_saved": 0}
+
+    docs, vectors = search_candidates(query_vector, fetch_k=max(settings.MMR_FETCH_K, k), acts=acts)
+    if not docs:
+        return [], {"mode": "mmr", "candidates": 0, "chunks_returned": 0, "prompt_tokens": 0, "prompt_tokens_saved": 0}
+
+    similarities = cosine_similarities(query_vector, vectors)
+    kept = relevance_cutoff(similarities, settings.RELEVANCE_CUTOFF_RATIO, settings.RELEVANCE_MIN_SCORE)
+    picked = [int(kept[i]) for i in mmr_select(query_vector, vectors[kept], k=k, lambda_mult=settings.MMR_LAMBDA)]
+    selected = [docs[i] for i in picked]
+
+    # What plain top-k similarity search would have put in the prompt
+    baseline_tokens = sum(estimate_tokens(docs[i].page_content) for i in similarities.argsort()[::-1][:k])
+    tokens = sum(estimate_tokens(doc.page_content) for doc in selected)
+    report = {
+        "mode": "mmr",
+        "candidates": len(docs),
+        "dropped_by_cutoff": len(docs) - len(kept),
+        "chunks_returned": len(selected),
+        "prompt_tokens": tokens,
+        "prompt_tokens_saved": baseline_tokens - tokens,
+    }
+    logging.info(f"Retrieval: {report}")
+    return selected, report
+
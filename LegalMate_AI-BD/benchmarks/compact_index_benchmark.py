@@ -0,0 +1,118 @@
+"""
+Compares the compact (quantized, memory-mapped) index against the Chroma store.
+
+Queries are sampled from the stored chunk vectors with a little Gaussian noise,
+so no embedding API key is needed. Ground truth is an exact float32 search over
+every chunk. Each backend runs in its own subprocess so the RSS numbers are not
+polluted by the others.
+
+Usage (from LegalMate_AI-BD/):
+    python build_compact_index.py --quantization int8 --output compact_index_int8
+    python build_compact_index.py --quantization binary --output compact_index_binary
+    python -m benchmarks.compact_index_benchmark --compact compact_index_int8 compact_index_binary
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.core.startup import current_rss_mb
+
+
+def run_backend(backend: str, queries_path: str, k: int) -> Dict[str, Any]:
+    """Runs inside a subprocess: loads one backend, answers every query, reports ids and timings."""
+    queries = np.load(queries_path)
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+
+    if backend == "chroma":
+        import chromadb
+        from app.core.config import settings
+        from app.services.vector_store import served_collections
+        client = chromadb.PersistentClient(path=settings.CHROMA_DB_PATH)
+        collections = [client.get_collection(name) for name, _ in served_collections(settings.CHROMA_DB_PATH)]
+
+        def search(query: np.ndarray) -> List[str]:
+            hits = []
+            for collection in collections:
+                result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=["distances"])
+                hits.extend(zip(result["distances"][0], result["ids"][0]))
+            return [row_id for _, row_id in sorted(hits)[:k]]
+    else:
+        from app.services.compact_index import CompactIndex
+        index = CompactIndex.load(backend)
+
+        def search(query: np.ndarray) -> List[str]:
+            return [index.chunks[row]["id"] for row, _ in index.search(query, k=k)]
+
+    # First query pays lazy loading (HNSW index, mmap page-in); count it as load time
+    first = search(queries[0])
+    load_seconds = time.perf_counter() - started
+
+    results, latencies = [first], []
+    for query in queries[1:]:
+        query_started = time.perf_counter()
+        results.append(search(query))
+        latencies.append(time.perf_counter() - query_started)
+
+    return {
+        "backend": backend,
+        "load_ms": round(load_seconds * 1000, 1),
+        "rss_mb": round(current_rss_mb() - rss_before, 1),
+        "latency_ms_mean": round(float(np.mean(latencies)) * 1000, 3) if latencies else None,
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)) * 1000, 3) if latencies else None,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compact", nargs="+", default=["compact_index"], help="Compact index directories to compare")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.05, help="Std-dev of noise added to sampled vectors")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--queries-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_backend(args.worker, args.queries_file, args.k)))
+        return
+
+    from app.core.config import settings
+    from app.services.compact_index import _normalize, iter_chroma_rows
+
+    rows = list(iter_chroma_rows(settings.CHROMA_DB_PATH))
+    ids = [row[0] for row in rows]
+    vectors = _normalize(np.asarray([row[3] for row in rows], dtype=np.float32))
+    rng = np.random.default_rng(args.seed)
+    sample = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+    queries = _normalize(vectors[sample] + rng.normal(0, args.noise, (len(sample), vectors.shape[1])).astype(np.float32))
+    truth = [set(ids[i] for i in np.argsort(-(vectors @ query))[:args.k]) for query in queries]
+    del vectors
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queries_path = os.path.join(tmp, "queries.npy")
+        np.save(queries_path, queries)
+        print(f"{len(rows)} chunks, {len(queries)} queries, k={args.k}\n")
+        print(f"{'backend':<32}{'recall@k':>10}{'load ms':>10}{'mean ms':>10}{'p95 ms':>10}{'RSS MB':>10}")
+        for backend in ["chroma", *args.compact]:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.compact_index_benchmark", "--worker", backend, "--queries-file", queries_path, "--k", str(args.k)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            report = json.loads(output.strip().splitlines()[-1])
+            recall = np.mean([len(expected & set(got)) / len(expected) for expected, got in zip(truth, report["results"])])
+            print(f"{backend:<32}{recall:>10.3f}{report['load_ms']:>10}{report['latency_ms_mean']:>10}{report['latency_ms_p95']:>10}{report['rss_mb']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compares how long the server takes to load its retrieval index, and how much
+memory that costs, for each loading path: the persisted Chroma store (which
+loads each partition's HNSW segment and unpickles its index_metadata.pickle)
+versus the single-file snapshot (which parses a JSON header and memory-maps
+the sections).
+
+Each backend is loaded in a fresh subprocess through the same preload_index()
+call the server makes at startup, so the numbers match the "load_index" entry
+reported by /chat/health.
+
+Usage (from LegalMate_AI-BD/):
+    python index_snapshot.py export
+    python -m benchmarks.index_load_benchmark --backends chroma snapshot --runs 3
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+
+def load_backend() -> Dict[str, Any]:
+    """Runs inside a subprocess whose environment selects RETRIEVAL_BACKEND."""
+    from app.core.startup import current_rss_mb
+
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    from app.services.vector_store import preload_index
+    preload_index()
+    return {"load_ms": (time.perf_counter() - started) * 1000, "rss_mb": current_rss_mb() - rss_before}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["chroma", "snapshot"], choices=["chroma", "compact", "snapshot"])
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per backend (the first run may hit a cold page cache)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(load_backend()))
+        return
+
+    print(f"{'backend':<12}{'load ms (min)':>15}{'load ms (mean)':>16}{'RSS MB':>10}")
+    for backend in args.backends:
+        reports = []
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.index_load_benchmark", "--worker"],
+                check=True, capture_output=True, text=True, env={**os.environ, "RETRIEVAL_BACKEND": backend},
+            ).stdout
+            reports.append(json.loads(output.strip().splitlines()[-1]))
+        load_ms = [report["load_ms"] for report in reports]
+        rss_mb = float(np.mean([report["rss_mb"] for report in reports]))
+        print(f"{backend:<12}{min(load_ms):>15.1f}{float(np.mean(load_ms)):>16.1f}{rss_mb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
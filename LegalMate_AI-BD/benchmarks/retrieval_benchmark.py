@@ -0,0 +1,180 @@
+"""
+Offline retrieval quality/latency benchmark for HNSW parameters.
+
+Runs a labelled query set (query -> expected Article/Section) against the chunks
+of the persisted store and sweeps HNSW `M`, `ef_search` and `k`. For each `M`
+and `ef_search` pair the stored vectors are re-indexed into an in-memory Chroma
+collection, so the persisted store is never modified. An exact (brute-force)
+search is reported as the quality ceiling.
+
+A chunk counts as relevant when its text contains the expected citation
+(e.g. "Article 21") and, if the label names an act, it belongs to that act.
+recall@k is the fraction of queries with a relevant chunk in the top k;
+MRR uses the rank of the first relevant chunk.
+
+Query embeddings need COHERE_API_KEY once; they are cached next to the
+query file, keyed by the query texts and embedding model, so later sweeps
+make no API calls.
+
+Usage (from LegalMate_AI-BD/):
+    python -m benchmarks.retrieval_benchmark --m 8 16 32 --ef 10 50 100 --k 3 5 10
+Apply the chosen values through HNSW_M, HNSW_CONSTRUCTION_EF, HNSW_SEARCH_EF
+and RETRIEVAL_K, then rebuild with create_vectorstore.py.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_QUERIES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "labelled_queries.jsonl")
+ADD_BATCH_SIZE = 1000
+# chromadb >= 1.0 defaults, swept when the HNSW settings are unset
+CHROMA_DEFAULT_M = 16
+CHROMA_DEFAULT_CONSTRUCTION_EF = 100
+CHROMA_DEFAULT_SEARCH_EF = 100
+
+
+def load_labelled_queries(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def citation_pattern(expected: str) -> re.Pattern:
+    # "Section 65B" also matches "SECTION  65B" or a line break between the words
+    kind, _, number = expected.partition(" ")
+    return re.compile(rf"\b{re.escape(kind)}\s+{re.escape(number)}\b", re.IGNORECASE)
+
+
+def embed_queries(labelled: List[Dict[str, Any]], cache_prefix: str) -> np.ndarray:
+    """
+    Embeds the labelled queries, cached in `<cache_prefix>.<digest>.embeddings.npy`.
+    The digest covers the embedding model and every query text in order, so
+    editing, reordering or re-embedding with another model never reuses stale vectors.
+    """
+    from app.services.vector_store import EMBEDDING_MODEL, get_embeddings
+
+    texts = [item["query"] for item in labelled]
+    digest = hashlib.sha256(json.dumps([EMBEDDING_MODEL, texts]).encode("utf-8")).hexdigest()[:16]
+    cache_path = f"{cache_prefix}.{digest}.embeddings.npy"
+    if os.path.exists(cache_path):
+        return np.load(cache_path, allow_pickle=False)
+    api_key = os.getenv("COHERE_API_KEY")
+    if not api_key:
+        raise SystemExit("COHERE_API_KEY is required to embed the labelled queries (results are cached afterwards).")
+    vectors = np.asarray(get_embeddings(api_key).embed(texts, input_type="search_query"), dtype=np.float32)
+    np.save(cache_path, vectors)
+    return vectors
+
+
+def score(ranked: List[List[int]], relevant: List[set], k: int) -> Dict[str, float]:
+    hits, reciprocal_ranks = 0, []
+    for rows, expected in zip(ranked, relevant):
+        rank = next((position for position, row in enumerate(rows[:k], start=1) if row in expected), None)
+        hits += rank is not None
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+    return {"recall": hits / len(ranked), "mrr": float(np.mean(reciprocal_ranks))}
+
+
+def run_sweep(vectors: np.ndarray, queries: np.ndarray, relevant: List[set], ms: List[int], efs: List[int], ks: List[int], construction_ef: int) -> List[Dict[str, Any]]:
+    import chromadb
+    from app.services.vector_store import hnsw_collection_metadata
+
+    max_k = max(ks)
+    report = []
+
+    # Exact search: quality ceiling and latency baseline (L2, like the Chroma collections)
+    latencies, ranked = [], []
+    for query in queries:
+        started = time.perf_counter()
+        distances = np.linalg.norm(vectors - query, axis=1)
+        ranked.append(np.argsort(distances)[:max_k].tolist())
+        latencies.append(time.perf_counter() - started)
+    for k in ks:
+        report.append({"index": "exact", "M": None, "ef_search": None, "k": k, **score(ranked, relevant, k), **latency_stats(latencies)})
+
+    client = chromadb.EphemeralClient()
+    ids = [str(row) for row in range(len(vectors))]
+    for m in ms:
+        for ef in efs:
+            name = f"bench_m{m}_ef{ef}"
+            collection = client.create_collection(name, metadata={"hnsw:space": "l2", **hnsw_collection_metadata(m=m, construction_ef=construction_ef, search_ef=ef)})
+            build_started = time.perf_counter()
+            for start in range(0, len(vectors), ADD_BATCH_SIZE):
+                collection.add(ids=ids[start:start + ADD_BATCH_SIZE], embeddings=vectors[start:start + ADD_BATCH_SIZE].tolist())
+            build_seconds = time.perf_counter() - build_started
+
+            latencies, ranked = [], []
+            for query in queries:
+                started = time.perf_counter()
+                result = collection.query(query_embeddings=[query.tolist()], n_results=min(max_k, len(vectors)), include=[])
+                latencies.append(time.perf_counter() - started)
+                ranked.append([int(row_id) for row_id in result["ids"][0]])
+            for k in ks:
+                report.append({"index": "hnsw", "M": m, "ef_search": ef, "k": k, "build_s": round(build_seconds, 2), **score(ranked, relevant, k), **latency_stats(latencies)})
+            client.delete_collection(name)
+    return report
+
+
+def latency_stats(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "latency_ms_mean": round(float(np.mean(latencies)) * 1000, 3),
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)) * 1000, 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from dotenv import load_dotenv
+    load_dotenv()
+    from app.core.config import settings
+    from app.services.compact_index import iter_chroma_rows
+    from app.services.vector_store import GENERAL_PARTITION
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", default=DEFAULT_QUERIES, help="JSONL file of {query, expected, act?} labels")
+    parser.add_argument("--m", type=int, nargs="+", default=[settings.HNSW_M or CHROMA_DEFAULT_M])
+    parser.add_argument("--ef", type=int, nargs="+", default=sorted({10, 50, settings.HNSW_SEARCH_EF or CHROMA_DEFAULT_SEARCH_EF}))
+    parser.add_argument("--k", type=int, nargs="+", default=[settings.RETRIEVAL_K])
+    parser.add_argument("--construction-ef", type=int, default=settings.HNSW_CONSTRUCTION_EF or CHROMA_DEFAULT_CONSTRUCTION_EF)
+    parser.add_argument("--json", help="Optional path to write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    labelled = load_labelled_queries(args.queries)
+    rows = list(iter_chroma_rows(settings.CHROMA_DB_PATH))
+    vectors = np.asarray([row[3] for row in rows], dtype=np.float32)
+
+    # Act labels can only be checked against a store built with act partitions
+    partitioned = any(row[4] != GENERAL_PARTITION for row in rows)
+    relevant = []
+    for item in labelled:
+        pattern = citation_pattern(item["expected"])
+        relevant.append({
+            position for position, (_, text, _, _, act) in enumerate(rows)
+            if pattern.search(text or "") and (not partitioned or not item.get("act") or item["act"] == act)
+        })
+    unanswerable = [item["query"] for item, expected in zip(labelled, relevant) if not expected]
+    if unanswerable:
+        print(f"Warning: {len(unanswerable)} queries have no matching chunk in the store and can never be recalled:")
+        for query in unanswerable:
+            print(f"  - {query}")
+
+    queries = embed_queries(labelled, os.path.splitext(args.queries)[0])
+    report = run_sweep(vectors, queries, relevant, args.m, args.ef, args.k, args.construction_ef)
+
+    print(f"\n{len(rows)} chunks, {len(labelled)} labelled queries\n")
+    print(f"{'index':<7}{'M':>5}{'ef':>6}{'k':>4}{'recall@k':>10}{'MRR':>8}{'mean ms':>10}{'p95 ms':>10}")
+    for row in report:
+        print(f"{row['index']:<7}{row['M'] or '-':>5}{row['ef_search'] or '-':>6}{row['k']:>4}{row['recall']:>10.3f}{row['mrr']:>8.3f}{row['latency_ms_mean']:>10}{row['latency_ms_p95']:>10}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
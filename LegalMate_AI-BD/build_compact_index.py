@@ -0,0 +1,20 @@
+import argparse
+import os
+from dotenv import load_dotenv
+from app.services.compact_index import QUANTIZATIONS, build_compact_index
+
+# --- Use Environment Variable for Consistency ---
+load_dotenv()
+PERSIST_DIRECTORY = os.getenv("CHROMA_DB_PATH", "chroma_db")
+OUTPUT_DIRECTORY = os.getenv("COMPACT_INDEX_PATH", "compact_index")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the persisted Chroma store into a quantized, memory-mapped index.")
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default="int8")
+    parser.add_argument("--output", default=OUTPUT_DIRECTORY)
+    args = parser.parse_args()
+
+    print(f"Exporting '{PERSIST_DIRECTORY}' to '{args.output}' ({args.quantization})...")
+    manifest = build_compact_index(PERSIST_DIRECTORY, args.output, quantization=args.quantization)
+    print(f"Compact index created: {manifest['count']} chunks, {manifest['dimensions']} dimensions, acts: {', '.join(manifest['acts'])}")
+    print("Set RETRIEVAL_BACKEND=compact to serve queries from it.")
@@ -5,6 +5,7 @@ from langchain_community.document_loaders import DirectoryLoader, PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_cohere import CohereEmbeddings
 from langchain_chroma import Chroma
+from app.services.vector_store import detect_act, hnsw_collection_metadata, partition_collection_name
 
 # --- Use Environment Variable for Consistency ---
 load_dotenv()
@@ -27,6 +28,16 @@ def create_vector_store():
     texts = text_splitter.split_documents(documents)
     print(f"Created {len(texts)} text chunks.")
 
+    # --- PARTITION BY ACT ---
+    # Every act gets its own collection so queries can be scoped to it
+    partitions = {}
+    for chunk in texts:
+        act = detect_act(chunk.metadata.get("source", ""))
+        chunk.metadata["act"] = act
+        partitions.setdefault(act, []).append(chunk)
+    for act, chunks in sorted(partitions.items()):
+        print(f"  - {partition_collection_name(act)}: {len(chunks)} chunks")
+
     print("Initializing Cohere embedding model...")
     cohere_api_key = os.getenv("COHERE_API_KEY")
     if not cohere_api_key:
@@ -38,23 +49,30 @@ def create_vector_store():
 
     # --- BATCHING LOGIC TO AVOID RATE LIMITS ---
     batch_size = 90  # Process 90 chunks per batch (under the 100 limit)
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i:i+batch_size]
-        print(f"Processing batch {i//batch_size + 1}/{(len(texts) + batch_size - 1)//batch_size}...")
+    batches = [
+        (act, chunks[i:i+batch_size])
+        for act, chunks in sorted(partitions.items())
+        for i in range(0, len(chunks), batch_size)
+    ]
+    stores = {}
+    for n, (act, batch) in enumerate(batches, start=1):
+        print(f"Processing batch {n}/{len(batches)} ({partition_collection_name(act)})...")
         
-        if i == 0:
-            # For the first batch, create the Chroma DB
-            db = Chroma.from_documents(
+        if act not in stores:
+            # For the first batch of an act, create its collection
+            stores[act] = Chroma.from_documents(
                 batch, 
                 embeddings, 
+                collection_name=partition_collection_name(act),
+                collection_metadata=hnsw_collection_metadata() or None,
                 persist_directory=PERSIST_DIRECTORY
             )
         else:
-            # For subsequent batches, add to the existing DB
-            db.add_documents(batch)
+            # For subsequent batches, add to the existing collection
+            stores[act].add_documents(batch)
         
         # If it's not the last batch, wait for 61 seconds before the next one
-        if i + batch_size < len(texts):
+        if n < len(batches):
             print("Rate limit cooldown: Waiting for 61 seconds...")
             time.sleep(61)
 
@@ -0,0 +1,49 @@
+import argparse
+import os
+from dotenv import load_dotenv
+from app.services.compact_index import QUANTIZATIONS
+from app.services.index_snapshot import export_snapshot, install_snapshot, read_header, verify_snapshot
+
+# --- Use Environment Variable for Consistency ---
+load_dotenv()
+PERSIST_DIRECTORY = os.getenv("CHROMA_DB_PATH", "chroma_db")
+SNAPSHOT_PATH = os.getenv("INDEX_SNAPSHOT_PATH", "legal_index.lmsnap")
+
+
+def describe(header, path):
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    return (
+        f"v{header['format_version']} {header['quantization']} snapshot, {size_mb:.1f} MB: "
+        f"{header['count']} chunks, {header['dimensions']} dimensions, acts: {', '.join(header['acts'])} "
+        f"(built {header['created_at']} with {header['embedding_model']})"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the persisted Chroma store into a single snapshot file, or install/inspect one.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Pack the Chroma store into a snapshot file")
+    export_parser.add_argument("--quantization", choices=QUANTIZATIONS, default="int8")
+    export_parser.add_argument("--output", default=SNAPSHOT_PATH)
+
+    import_parser = commands.add_parser("import", help="Verify a snapshot and install it as INDEX_SNAPSHOT_PATH")
+    import_parser.add_argument("source")
+
+    inspect_parser = commands.add_parser("inspect", help="Print a snapshot's header and verify its checksums")
+    inspect_parser.add_argument("path", nargs="?", default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print(f"Exporting '{PERSIST_DIRECTORY}' to '{args.output}' ({args.quantization})...")
+        header = export_snapshot(PERSIST_DIRECTORY, args.output, quantization=args.quantization)
+        print(f"Snapshot created: {describe(header, args.output)}")
+    elif args.command == "import":
+        print(f"Verifying '{args.source}' and installing it as '{SNAPSHOT_PATH}'...")
+        header = install_snapshot(args.source, SNAPSHOT_PATH)
+        print(f"Snapshot installed: {describe(header, SNAPSHOT_PATH)}")
+    else:
+        print(describe(read_header(args.path)[0], args.path))
+        verify_snapshot(args.path)
+        print("All section checksums match.")
+    print("Set RETRIEVAL_BACKEND=snapshot to serve queries from it.")
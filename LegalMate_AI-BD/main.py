@@ -1,11 +1,23 @@
 # FILE: main.py
 
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
+import threading
 from app.api import chatbots_routes
 from app.services.legalchatbot import AdaptiveLegalChatbot, LegalChatbot # <-- This import is correct
+from app.services.plan_cache import PlanCache
+from app.services.session_index import SessionIndex
+from app.services.job_queue import JobManager
+from app.services.vector_store import COMPACT_BACKENDS, preload_index
+from app.core.config import settings
+from app.core.startup import startup_timings
+
+startup_timings.record("import_app", time.perf_counter() - _IMPORT_STARTED)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -34,24 +46,61 @@ def startup_event():
     The services will be instantiated without API keys.
     """
     logging.info("Application startup: Initializing shared chat history store...")
+    app.state.startup_timings = startup_timings
+    init_started = time.perf_counter()
     try:
         # This store will be shared by all requests
         app.state.chat_history_store = {}
+        # Titles and last activity are indexed on write, alongside the store
+        app.state.session_index = SessionIndex()
+        # Planner results are shared too, so both endpoints benefit from each other's hits
+        app.state.plan_cache = PlanCache()
         
         # Initialize the services, passing the shared store to them
-        app.state.adaptive_chatbot_service = AdaptiveLegalChatbot(app.state.chat_history_store)
-        app.state.legacy_chatbot_service = LegalChatbot(app.state.chat_history_store)
+        app.state.adaptive_chatbot_service = AdaptiveLegalChatbot(app.state.chat_history_store, app.state.plan_cache, app.state.session_index)
+        app.state.legacy_chatbot_service = LegalChatbot(app.state.chat_history_store, app.state.plan_cache, app.state.session_index)
+        app.state.job_manager = JobManager(app.state.adaptive_chatbot_service)
+        startup_timings.record("init_services", time.perf_counter() - init_started)
         
         logging.info("✅ Chat history store and stateless chatbot services initialized successfully.")
     except Exception as e:
         app.state.chat_history_store = None
+        app.state.session_index = None
+        app.state.plan_cache = None
         app.state.adaptive_chatbot_service = None
         app.state.legacy_chatbot_service = None
+        app.state.job_manager = None
         logging.critical(f"❌ CRITICAL: Failed to initialize chatbot services on startup: {e}", exc_info=True)
+        return
+
+    if settings.RETRIEVAL_BACKEND in COMPACT_BACKENDS:
+        # Mapping a compact index or snapshot is cheap, so load it before serving
+        try:
+            preload_index()
+        except Exception as e:
+            logging.critical(f"❌ CRITICAL: Failed to load the '{settings.RETRIEVAL_BACKEND}' index: {e}", exc_info=True)
+
+    if settings.WARMUP_ON_STARTUP:
+        # Warm up in the background so the server accepts requests immediately
+        startup_timings.warmup_status = "running"
+        threading.Thread(target=_run_warmup, args=(app.state.adaptive_chatbot_service,), daemon=True).start()
+
+def _run_warmup(service: AdaptiveLegalChatbot):
+    """Preloads provider SDKs, the vector index and prompt templates."""
+    try:
+        for phase, seconds in service.warmup().items():
+            startup_timings.record(f"warmup.{phase}", seconds)
+        startup_timings.warmup_status = "completed"
+        logging.info(f"Warmup completed: {startup_timings.snapshot()['phases_ms']}")
+    except Exception as e:
+        startup_timings.warmup_status = "failed"
+        logging.error(f"Warmup failed: {e}", exc_info=True)
 
 @app.on_event("shutdown")
 def shutdown_event():
-    """Log application shutdown."""
+    """Stop background job workers and log application shutdown."""
+    if getattr(app.state, 'job_manager', None):
+        app.state.job_manager.shutdown()
     logging.info("Chatbot Service shutdown.")
 
 # Include only the chatbots_routes router